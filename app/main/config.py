@@ -10,8 +10,21 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'UtmqEhIIcPuNbXiKLi3Ufk5C6yv8cEiyiiywfsQSdtE=')
     UPLOAD_LOCATION = os.getenv('UPLOAD_LOCATION', f'{basedir}/files')
     PREQUAL_ID_COUNTER_FILE = os.getenv('PREQUAL_ID_COUNTER_LOCATION', f'{basedir}/prequal_id_counter.txt')
-    PREQUAL_ID_COUNTER_LOCK_FILE = os.getenv('PREQUAL_ID_COUNTER_LOCATION', f'{basedir}/prequal_id_counter.txt.lock')
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://'
+    CANDIDATE_IMPORT_BATCH_SIZE = int(os.getenv('CANDIDATE_IMPORT_BATCH_SIZE', 1000))
+    CANDIDATE_IMPORT_CHUNK_SIZE = int(os.getenv('CANDIDATE_IMPORT_CHUNK_SIZE', 32 * 1024 * 1024))
+    CANDIDATE_ASSIGN_BATCH_SIZE = int(os.getenv('CANDIDATE_ASSIGN_BATCH_SIZE', 5000))
+    MAILER_FILE_BATCH_SIZE = int(os.getenv('MAILER_FILE_BATCH_SIZE', 1000))
+    PREQUAL_ID_BLOCK_SIZE = int(os.getenv('PREQUAL_ID_BLOCK_SIZE', 1000))
+    BCRYPT_PASSWORD_ROUNDS = int(os.getenv('BCRYPT_PASSWORD_ROUNDS', 12))
+    BCRYPT_CODE_ROUNDS = int(os.getenv('BCRYPT_CODE_ROUNDS', 10))  # 2FA and reset codes expire within a day
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 256))
+    PASSWORD_HASH_WAIT = float(os.getenv('PASSWORD_HASH_WAIT', 10))  # seconds to wait for room in a full queue
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+    TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 30))
+    PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000))
+    PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', 30))
     SMART_CREDIT_CLIENT_KEY = os.environ.get('SMART_CREDIT_CLIENT_KEY')
     SMART_CREDIT_PUBLISHER_ID = os.environ.get('SMART_CREDIT_PUBLISHER_ID')
     ENABLE_CORS = False
@@ -29,6 +42,8 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'flask_boilerplate_test.db')
+    BCRYPT_PASSWORD_ROUNDS = 4
+    BCRYPT_CODE_ROUNDS = 4
     PRESERVE_CONTEXT_ON_EXCEPTION = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
@@ -55,4 +70,7 @@ config_by_name = dict(
 key = Config.SECRET_KEY
 upload_location = Config.UPLOAD_LOCATION
 prequal_id_counter_file = Config.PREQUAL_ID_COUNTER_FILE
-prequal_id_counter_lock_file = Config.PREQUAL_ID_COUNTER_LOCK_FILE
+token_cache_size = Config.TOKEN_CACHE_SIZE
+token_cache_ttl = Config.TOKEN_CACHE_TTL
+principal_cache_size = Config.PRINCIPAL_CACHE_SIZE
+principal_cache_ttl = Config.PRINCIPAL_CACHE_TTL
@@ -2,6 +2,8 @@ from flask import request
 from flask_restplus import Resource
 
 from app.main.service.auth_helper import Auth
+from app.main.util.decorator import admin_token_required
+from app.main.util.password_pool import password_pool
 from ..util.dto import AuthDto
 
 api = AuthDto.api
@@ -24,6 +26,17 @@ class UserLogin(Resource):
         return Auth.login_user(data=post_data)
 
 
+@api.route('/password-pool')
+class PasswordPoolStats(Resource):
+    """
+    Password Hashing Pool Metrics Resource
+    """
+    @api.doc('password hashing pool queue depth')
+    @admin_token_required
+    def get(self):
+        return password_pool().stats(), 200
+
+
 @api.route('/logout')
 class LogoutAPI(Resource):
     """
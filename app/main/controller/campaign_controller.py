@@ -1,18 +1,22 @@
 import datetime
+import os
 import uuid
 
 from flask import request, send_file
 from flask_restplus import Resource
+from redis.exceptions import LockError
 
 from app.main import db
 from app.main.model.campaign import Campaign
-from app.main.model.candidate import CandidateImport, Candidate
+from app.main.model.candidate import CandidateImport
 from app.main.util.dto import CampaignDto
+from app.main.util.parsers import mailer_file_options
 
 api = CampaignDto.api
 _campaign = CampaignDto.campaign
 _new_campaign = CampaignDto.new_campaign
 _update_campaign = CampaignDto.update_campaign
+_campaign_tasks = CampaignDto.campaign_tasks
 
 
 @api.route('/')
@@ -58,12 +62,16 @@ class UpdateCampaign(Resource):
         payload = request.json
         try:
             campaign = Campaign.query.filter_by(public_id=campaign_id).first()
+            mailer_values = _mailer_values(campaign)
             campaign.name = payload.get('name') or campaign.name
             campaign.description = payload.get('description') or campaign.description
             campaign.phone = payload.get('phone') or campaign.phone
             campaign.job_number = payload.get('job_number') or campaign.job_number
             campaign.mailing_date = payload.get('mailing_date') or campaign.mailing_date
             campaign.offer_expire_date = payload.get('offer_expire_date') or campaign.offer_expire_date
+            if _mailer_values(campaign) != mailer_values:
+                # these values are printed on every mailer row; appending after a change would mix old and new ones
+                campaign.reset_mailer_watermark()
             db.session.commit()
 
             return {'success': True, 'message': 'Successfully updated campaign'}, 200
@@ -75,22 +83,78 @@ class UpdateCampaign(Resource):
 @api.route('/<campaign_id>/mailer-file')
 @api.param('campaign_id', 'Campaign public id')
 class GenerateCampaignMailingFile(Resource):
+    @api.expect(mailer_file_options)
     def put(self, campaign_id):
         """ Generate Campaign Mailer File """
+        options = mailer_file_options.parse_args()
         campaign = Campaign.query.filter_by(public_id=campaign_id).first()
-        if campaign.candidates.count() > 0:
-            campaign.launch_task('generate_mailer_file')
-            return {'success': True, 'message': 'Initiated generate mailer file'}, 200
+        if campaign and campaign.candidate_count > 0:
+            try:
+                task, launched = campaign.launch_task('generate_mailer_file', 'Generate campaign mailer file',
+                                                      incremental=options['incremental'], delta=options['delta'],
+                                                      compress=options['compress'])
+            except LockError:
+                api.abort(409, message='Mailer file generation is being started by another request', success=False)
+            db.session.commit()
+            if not launched:
+                return {'success': True, 'message': 'Mailer file generation already in progress',
+                        'task_id': task.id}, 200
+            return {'success': True, 'message': 'Initiated generate mailer file', 'task_id': task.id}, 200
         else:
             api.abort(404, message='Campaign does not exist', success=False)
 
+    @api.expect(mailer_file_options)
     def get(self, campaign_id):
         """ Download Generated Campaign Mailer File """
+        options = mailer_file_options.parse_args()
         campaign = Campaign.query.filter_by(public_id=campaign_id).first()
-        if campaign:
-            return send_file(campaign.mailer_file)
-        else:
+        if not campaign:
+            api.abort(404, message='Campaign does not exist', success=False)
+
+        file_path = campaign.mailer_delta_file if options['delta'] else campaign.mailer_file
+        if not file_path or not os.path.isfile(file_path):
+            api.abort(404, message='Mailer file has not been generated', success=False)
+        return _send_mailer_file(file_path)
+
+
+@api.route('/<campaign_id>/tasks')
+@api.param('campaign_id', 'Campaign public id')
+@api.response(404, 'Campaign not found')
+class CampaignTasks(Resource):
+    @api.doc('retrieve campaign mailer tasks')
+    @api.marshal_with(_campaign_tasks)
+    def get(self, campaign_id):
+        """ Get Campaign Mailer Tasks and their progress """
+        campaign = Campaign.query.filter_by(public_id=campaign_id).first()
+        if not campaign:
             api.abort(404, message='Campaign does not exist', success=False)
+        return campaign, 200
+
+
+def _mailer_values(campaign):
+    return campaign.phone, campaign.job_number, campaign.mailing_date, campaign.offer_expire_date
+
+
+def _send_mailer_file(file_path):
+    """
+    Serves a mailer file with byte range support so interrupted downloads can resume
+    Gzipped files are sent as-is: as a text/csv body with Content-Encoding: gzip to clients which accept gzip,
+    otherwise as an application/gzip download without Content-Encoding
+    """
+    filename = os.path.basename(file_path)
+    compressed = file_path.endswith('.gz')
+    if compressed and 'gzip' in request.accept_encodings:
+        response = send_file(file_path, mimetype='text/csv', as_attachment=True,
+                             attachment_filename=filename[:-len('.gz')])
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        # mimetypes guesses text/csv for .csv.gz, which would hide the compression from the client
+        response = send_file(file_path, mimetype='application/gzip' if compressed else 'text/csv',
+                             as_attachment=True, attachment_filename=filename)
+    if compressed:
+        # the response depends on Accept-Encoding, which shared caches must key on
+        response.vary.add('Accept-Encoding')
+    return response.make_conditional(request, accept_ranges=True, complete_length=os.path.getsize(file_path))
 
 
 @api.route('/<campaign_id>/import/<import_id>')
@@ -99,12 +163,15 @@ class GenerateCampaignMailingFile(Resource):
 class AssignImportToCampaign(Resource):
     def put(self, campaign_id, import_id):
         """ Assign Candidate Import to Campaign """
-        try:
-            campaign = Campaign.query.filter_by(public_id=campaign_id).first()
-            candidate_import = CandidateImport.query.filter_by(public_id=import_id).first()
+        campaign = Campaign.query.filter_by(public_id=campaign_id).first()
+        candidate_import = CandidateImport.query.filter_by(public_id=import_id).first()
+        if not campaign or not candidate_import:
+            api.abort(404, message='Campaign or Candidate Import does not exist', success=False)
 
-            Candidate.query.filter_by(import_id=candidate_import.id).update({Candidate.campaign_id: campaign.id})
+        try:
+            task = candidate_import.launch_task('assign_import_to_campaign',
+                                                f'Assign candidates to campaign {campaign.job_number}', campaign.id)
             db.session.commit()
-            return {'success': True, 'message': 'Successfully assigned import to campaign'}, 200
+            return {'success': True, 'message': 'Initiated assigning import to campaign', 'task_id': task.id}, 200
         except Exception as e:
             api.abort(500, message=str(e), success=False)
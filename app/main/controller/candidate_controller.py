@@ -1,4 +1,6 @@
 import os
+import shutil
+import uuid
 
 from flask import request, current_app
 from flask_restplus import Resource
@@ -9,7 +11,7 @@ from app.main.model.candidate import CandidateImport
 from app.main.model.credit_report_account import CreditReportSignupStatus
 from app.main.service.auth_helper import Auth
 from app.main.service.candidate_service import save_new_candidate_import, save_changes, get_all_candidate_imports, \
-    get_candidate, get_all_candidates, update_candidate
+    get_candidate, get_all_candidates, update_candidate, get_candidate_import_rejects
 from app.main.service.credit_report_account_service import save_new_credit_report_account, update_credit_report_account
 from app.main.service.smartcredit_service import start_signup, LockedException, create_customer, \
     get_id_verification_question, answer_id_verification_questions, update_customer, does_email_exist, \
@@ -19,12 +21,15 @@ from ..util.dto import CandidateDto
 api = CandidateDto.api
 _candidate_upload = CandidateDto.candidate_upload
 _import = CandidateDto.imports
+_import_rejects = CandidateDto.import_rejects
 _new_credit_report_account = CandidateDto.new_credit_report_account
 _update_credit_report_account = CandidateDto.update_credit_report_account
 _credit_account_verification_answers = CandidateDto.account_verification_answers
 _candidates = CandidateDto.candidates
 _update_candidate = CandidateDto.update_candidate
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 
 @api.route('/')
 class GetCandidates(Resource):
@@ -57,19 +62,38 @@ class CandidateUpload(Resource):
             filename = secure_filename(file.filename)
             file_path = os.path.join(upload_location, filename)
             file.save(file_path)
+            return _launch_candidate_import(file_path)
 
-            candidate_import = save_new_candidate_import(dict(file_path=file_path))
-            task = candidate_import.launch_task('parse_candidate_file',
-                                                'Parse uploaded candidate file and load db with entries')
-
-            save_changes()
+        else:
+            return {'status': 'failed', 'message': 'No file was provided'}, 409
 
-            resp = {'task_id': task.id}
-            return resp, 200
 
-        else:
+@api.route('/upload/stream')
+@api.param('filename', 'Name to store the uploaded file under')
+class CandidateStreamUpload(Resource):
+    @api.doc('create candidates from raw csv request body')
+    def post(self):
+        """ Creates Candidates from a raw CSV request body without multipart buffering """
+        if not request.content_length:
             return {'status': 'failed', 'message': 'No file was provided'}, 409
 
+        filename = secure_filename(request.args.get('filename') or f'{uuid.uuid4()}.csv')
+        file_path = os.path.join(upload_location, filename)
+        with open(file_path, 'wb') as upload:
+            shutil.copyfileobj(request.stream, upload, UPLOAD_CHUNK_SIZE)
+
+        return _launch_candidate_import(file_path)
+
+
+def _launch_candidate_import(file_path):
+    candidate_import = save_new_candidate_import(dict(file_path=file_path))
+    task = candidate_import.launch_import(current_app.config['CANDIDATE_IMPORT_CHUNK_SIZE'])
+
+    save_changes()
+
+    resp = {'task_id': task.id}
+    return resp, 200
+
 
 @api.route('/imports')
 class CandidateImports(Resource):
@@ -101,6 +125,45 @@ class CandidateImportRecords(Resource):
             api.abort(404, **response_object)
 
 
+@api.route('/imports/<public_id>/rejects')
+@api.param('public_id', 'The Candidate Import Identifier')
+@api.param('page', 'Page of rejected rows to retrieve')
+@api.response(404, 'Candidate Import not found')
+class CandidateImportRejects(Resource):
+    @api.doc('retrieve rows rejected by candidate import')
+    @api.marshal_list_with(_import_rejects, envelope='data')
+    def get(self, public_id):
+        """ Get Candidate Import Rejected Rows """
+        candidate_import = CandidateImport.query.filter_by(public_id=public_id).first()
+        if not candidate_import:
+            api.abort(404, message='Candidate Import does not exist', success=False)
+
+        page = request.args.get('page', 1, type=int)
+        return get_candidate_import_rejects(candidate_import, page), 200
+
+
+@api.route('/imports/<public_id>/resume')
+@api.param('public_id', 'The Candidate Import Identifier')
+@api.response(404, 'Candidate Import not found')
+class ResumeCandidateImport(Resource):
+    @api.doc('resume an interrupted candidate import')
+    def put(self, public_id):
+        """ Resume Candidate Import from its last checkpoint """
+        candidate_import = CandidateImport.query.filter_by(public_id=public_id).first()
+        if not candidate_import:
+            api.abort(404, message='Candidate Import does not exist', success=False)
+
+        if candidate_import.has_active_tasks():
+            return {'success': False, 'message': 'Candidate Import is still being processed'}, 409
+
+        task = candidate_import.resume_import()
+        if not task:
+            return {'success': False, 'message': 'Candidate Import has nothing to resume'}, 409
+
+        save_changes()
+        return {'task_id': task.id}, 200
+
+
 def _handle_get_candidate(candidate_public_id):
     candidate = get_candidate(candidate_public_id)
     if not candidate:
@@ -1,29 +1,115 @@
-from .. import db
 import datetime
+import hashlib
+
+import jwt
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.main.config import token_cache_size, token_cache_ttl
+from app.main.util.cache import TTLCache
+from .. import db
+
+# tokens recently found not to be blacklisted; a logout handled by another process is seen here after at most the ttl
+_verified_tokens = TTLCache(maxsize=token_cache_size, ttl=token_cache_ttl)
+
+# set by warm_cache once every unexpired blacklisted token is in redis; lost together with them on a flush
+CACHE_LOADED_KEY = 'blacklist_token:loaded'
 
 
 class BlacklistToken(db.Model):
     """
-    Token Model for storing JWT tokens
+    Token Model for storing digests of revoked JWT tokens until they expire
     """
     __tablename__ = 'blacklist_tokens'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    token = db.Column(db.String(500), unique=True, nullable=False)
+    token_digest = db.Column(db.String(64), unique=True, nullable=False)  # sha256 hex digest of the JWT
     blacklisted_on = db.Column(db.DateTime, nullable=False)
+    expires_on = db.Column(db.DateTime, index=True, nullable=True)  # UTC exp claim; None when the token never expires
 
     def __init__(self, token):
-        self.token = token
+        # a revoked token must not stay accepted through this process' cache of verified tokens
+        _verified_tokens.pop(str(token))
+        self.token_digest = token_digest(token)
         self.blacklisted_on = datetime.datetime.now()
+        self.expires_on = _token_expiry(token)
 
     def __repr__(self):
-        return '<id: token: {}'.format(self.token)
+        return '<id: token digest: {}'.format(self.token_digest)
+
+    def cache(self):
+        """
+        Marks the token as revoked in redis until it expires, so checking it needs no database query
+        :raises RedisError: when redis cannot be written; the token must then not be reported as revoked
+        """
+        ttl = None
+        if self.expires_on is not None:
+            ttl = int((self.expires_on - datetime.datetime.utcnow()).total_seconds())
+            if ttl <= 0:
+                return
+        current_app.redis.set(_cache_key(self.token_digest), 1, ex=ttl)
+
+    @staticmethod
+    def warm_cache():
+        """
+        Loads blacklisted tokens which have not expired yet into redis, e.g. after deploying or after redis lost its
+        data; until the cache is marked loaded, tokens are checked against the database
+        """
+        cached = 0
+        for blacklist_token in BlacklistToken._unexpired().yield_per(1000):
+            blacklist_token.cache()
+            cached += 1
+        current_app.redis.set(CACHE_LOADED_KEY, 1)
+        return cached
+
+    @staticmethod
+    def purge_expired():
+        """ Deletes tokens past their expiry, which can no longer be used anyway """
+        purged = BlacklistToken.query.filter(BlacklistToken.expires_on <= datetime.datetime.utcnow()) \
+            .delete(synchronize_session=False)
+        db.session.commit()
+        return purged
 
     @staticmethod
     def check_blacklist(auth_token):
         # check whether auth token has been blacklisted
-        res = BlacklistToken.query.filter_by(token=str(auth_token)).first()
-        if res:
-            return True
-        else:
-            return False
\ No newline at end of file
+        token = str(auth_token)
+        if token in _verified_tokens:
+            return False
+
+        digest = token_digest(token)
+        try:
+            loaded, blacklisted = current_app.redis.pipeline(transaction=False) \
+                .exists(CACHE_LOADED_KEY).exists(_cache_key(digest)).execute()
+        except RedisError as e:
+            current_app.logger.warning(f'Token blacklist cache unavailable, checking database: {e}')
+            loaded = False
+
+        if not loaded:
+            # redis has not been warmed since it started or was flushed, so it may miss revoked tokens
+            blacklisted = BlacklistToken.query.filter_by(token_digest=digest).first() is not None
+
+        if not blacklisted:
+            _verified_tokens.set(token, True)
+        return bool(blacklisted)
+
+    @staticmethod
+    def _unexpired():
+        return BlacklistToken.query.filter(db.or_(BlacklistToken.expires_on.is_(None),
+                                                  BlacklistToken.expires_on > datetime.datetime.utcnow()))
+
+
+def token_digest(token):
+    return hashlib.sha256(str(token).encode('utf-8')).hexdigest()
+
+
+def _cache_key(digest):
+    return 'blacklist_token:' + digest
+
+
+def _token_expiry(token):
+    try:
+        expires = jwt.decode(token, verify=False).get('exp')
+    except jwt.InvalidTokenError:
+        return None
+    return datetime.datetime.utcfromtimestamp(expires) if expires is not None else None
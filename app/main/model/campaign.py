@@ -1,6 +1,12 @@
+import uuid
+
 from flask import current_app
 
 from app.main import db
+from app.main.model.task import MailerTask
+
+MAILER_TASK_LOCK = 'campaign:{campaign_id}:{name}:launch'
+MAILER_TASK_LOCK_TIMEOUT = 30  # seconds; expires the lock should the request die while holding it
 
 
 class Campaign(db.Model):
@@ -13,6 +19,7 @@ class Campaign(db.Model):
 
     # relationships
     candidates = db.relationship('Candidate', back_populates='campaign', lazy='dynamic')
+    tasks = db.relationship('MailerTask', backref='campaign', lazy='dynamic')
 
     # fields
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -22,6 +29,46 @@ class Campaign(db.Model):
     mailing_date = db.Column(db.String(10), nullable=False)
     offer_expire_date = db.Column(db.String(10), nullable=False)
     mailer_file = db.Column(db.String(100), unique=True, nullable=True)
+    mailer_delta_file = db.Column(db.String(100), unique=True, nullable=True)
+    mailer_exported_id = db.Column(db.Integer, nullable=True)  # highest candidate id written to mailer_file
+    mailer_resets = db.Column(db.Integer, nullable=False, default=0)  # bumped whenever the watermark is reset
+    candidate_count = db.Column(db.Integer, nullable=False, default=0)  # maintained by assign_import_to_campaign
+
+    def reset_mailer_watermark(self, candidate_id=None):
+        """
+        Forces a full mailer export, e.g. when a candidate at or below the export watermark joins the campaign
+        The reset is counted so an export already running does not set the watermark again when it finishes
+        :param candidate_id: only reset when this candidate is at or below the watermark
+        """
+        if candidate_id is None or self.mailer_exported_id is None or candidate_id <= self.mailer_exported_id:
+            self.mailer_exported_id = None
+            self.mailer_resets = Campaign.mailer_resets + 1
+
+    def launch_task(self, name, description, *args, **kwargs):
+        """
+        Enqueues a mailer task, unless one with the same name is still in flight for the campaign
+        The check and the enqueue run under a per campaign redis lock, so concurrent requests cannot both launch
+        :return: tuple of the task and whether it was launched by this call
+        """
+        with current_app.redis.lock(MAILER_TASK_LOCK.format(campaign_id=self.id, name=name),
+                                    timeout=MAILER_TASK_LOCK_TIMEOUT, blocking_timeout=MAILER_TASK_LOCK_TIMEOUT):
+            task = self.get_task_in_progress(name)
+            if task:
+                return task, False
+
+            # commit the task row before enqueueing, so the job always finds the task it reports to
+            task = MailerTask(id=str(uuid.uuid4()), name=name, description=description, campaign=self)
+            db.session.add(task)
+            db.session.commit()
+            current_app.mailer_file_queue.enqueue('app.main.tasks.campaign.' + name, self.id, *args,
+                                                  job_id=task.id, **kwargs)
+            return task, True
 
-    def launch_task(self, name, *args, **kwargs):
-        current_app.mailer_file_queue.enqueue('app.main.tasks.campaign.' + name, self.id, *args, **kwargs)
+    def get_task_in_progress(self, name):
+        """ Incomplete task whose job is still queued or running; tasks left behind by a dead worker are closed """
+        for task in self.tasks.filter_by(name=name, complete=False):
+            if task.is_active():
+                return task
+            task.complete = True
+            task.message = 'Job is no longer running'
+        return None
@@ -1,8 +1,10 @@
 import enum
+import uuid
 
 from flask import current_app
 
 from app.main.model.task import ImportTask
+from app.main.util.csv_stream import line_aligned_ranges
 from .. import db
 
 
@@ -60,6 +62,7 @@ class Candidate(db.Model):
     estimated_debt = db.Column(db.Integer, nullable=False)
 
     prequal_number = db.Column(db.String(12), unique=True, nullable=True)
+    fingerprint = db.Column(db.String(40), index=True, nullable=True)  # normalized name + address + zip digest
 
     debt3 = db.Column(db.Integer, nullable=False)  # Debt3 = 3% of revolving debt so =DEBT*3% assuming Debt is column L
     debt15 = db.Column(db.Integer, nullable=False)  # DEBT*1.5% = (L9+(L9*0.06))/60 assuming that L is the column that has the persons revolving debt
@@ -111,21 +114,111 @@ class CandidateImport(db.Model):
     # relationships
     candidates = db.relationship('Candidate', back_populates='import_record', lazy='dynamic')
     tasks = db.relationship('ImportTask', backref='candidate_import', lazy='dynamic')
+    rejects = db.relationship('CandidateImportReject', back_populates='import_record', lazy='dynamic')
 
     # fields
     file = db.Column(db.String(255), nullable=False)
     status = db.Column(db.Enum(CandidateImportStatus), nullable=False, default=CandidateImportStatus.CREATED)
+    imported_count = db.Column(db.Integer, nullable=False, default=0)
+    rejected_count = db.Column(db.Integer, nullable=False, default=0)
+    duplicate_count = db.Column(db.Integer, nullable=False, default=0)
     inserted_on = db.Column(db.DateTime, nullable=False)
     updated_on = db.Column(db.DateTime, nullable=False)
 
     def launch_task(self, name, description, *args, **kwargs):
-        rq_job = current_app.task_queue.enqueue('app.main.tasks.' + name, self.id, *args, **kwargs)
-        task = ImportTask(id=rq_job.get_id(), name=name, description=description, candidate_import=self)
+        """ Commits the task row before enqueueing its job, so the job always finds the task it reports to """
+        task = self._add_task(name, description)
+        db.session.commit()
+        self._enqueue(task, *args, **kwargs)
+        return task
+
+    def _add_task(self, name, description, **fields):
+        task = ImportTask(id=str(uuid.uuid4()), name=name, description=description, candidate_import=self, **fields)
         db.session.add(task)
         return task
 
+    def _enqueue(self, task, *args, **kwargs):
+        current_app.task_queue.enqueue('app.main.tasks.' + task.name, self.id, *args, job_id=task.id, **kwargs)
+
+    def launch_import(self, chunk_size):
+        """ Enqueues parsing of the import file, split by byte range across workers when larger than chunk_size """
+        ranges = line_aligned_ranges(self.file, chunk_size)
+        if len(ranges) <= 1:
+            return self.launch_task('parse_candidate_file', 'Parse uploaded candidate file and load db with entries')
+
+        # every chunk task row, offsets included, is committed before any of their jobs can start
+        chunk_tasks = [self._add_task('parse_candidate_file', f'Parse bytes {start}-{end} of uploaded candidate file',
+                                      start_offset=start, end_offset=end) for start, end in ranges]
+        return self._launch_chunks(chunk_tasks)
+
+    def resume_import(self):
+        """
+        Re-enqueues parse tasks that did not complete, continuing each from its last checkpoint
+        :return: task tracking the resumed import, or None when there is nothing to resume
+        """
+        stalled = [task for task in self.tasks.filter_by(name='parse_candidate_file') if
+                   not task.complete or task.message]
+        if not stalled:
+            return None
+
+        # the replacement tasks carry the checkpoint over and are committed before their jobs can start
+        resumed = []
+        for task in stalled:
+            resumed.append(self._add_task('parse_candidate_file', task.description, start_offset=task.start_offset,
+                                          end_offset=task.end_offset, checkpoint_offset=task.checkpoint_offset,
+                                          row_count=task.row_count, duplicate_count=task.duplicate_count))
+            db.session.delete(task)
+
+        self.status = CandidateImportStatus.RECEIVED
+        if all(task.end_offset is None for task in resumed):
+            db.session.commit()
+            self._enqueue(resumed[0], _resume_offset(resumed[0]), None)
+            return resumed[0]
+
+        for finalizer in self.tasks.filter_by(name='finalize_candidate_import'):
+            db.session.delete(finalizer)
+        return self._launch_chunks(resumed)
+
+    def has_active_tasks(self):
+        return any(task.is_active() for task in self.tasks.filter_by(complete=False))
+
+    def _launch_chunks(self, chunk_tasks):
+        """ Commits the chunk tasks and a finalizer task, then enqueues the chunks and the finalizer after them """
+        finalizer = self._add_task('finalize_candidate_import', 'Aggregate results of parsed candidate file chunks')
+        db.session.commit()
+
+        for task in chunk_tasks:
+            self._enqueue(task, _resume_offset(task), task.end_offset)
+        self._enqueue(finalizer, depends_on=[task.id for task in chunk_tasks])
+        return finalizer
+
     def get_tasks_in_progress(self):
         return ImportTask.query.filter_by(user=self, complete=False).all()
 
     def get_task_in_progress(self, name):
         return ImportTask.query.filter_by(name=name, user=self, complete=False).first()
+
+
+def _resume_offset(task):
+    return task.checkpoint_offset if task.checkpoint_offset is not None else task.start_offset
+
+
+class CandidateImportReject(db.Model):
+    """ Candidate Import Reject Model for rows of an import file which could not be loaded """
+    __tablename__ = "candidate_import_rejects"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    inserted_on = db.Column(db.DateTime, nullable=False)
+
+    # foreign keys
+    import_id = db.Column(db.Integer, db.ForeignKey('candidate_imports.id'), index=True, nullable=False)
+    task_id = db.Column(db.String(36), nullable=True)
+
+    # relationships
+    import_record = db.relationship('CandidateImport', back_populates='rejects')
+
+    # fields
+    line_number = db.Column(db.Integer, nullable=True)  # only known when the file was read from its first line
+    offset = db.Column(db.BigInteger, nullable=False)  # byte offset of the row within the import file
+    reason = db.Column(db.String(255), nullable=False)
+    row = db.Column(db.Text, nullable=True)
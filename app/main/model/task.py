@@ -5,15 +5,8 @@ from flask import current_app
 from app.main import db
 
 
-class ImportTask(db.Model):
-    __tablename__ = "import_tasks"
-
-    id = db.Column(db.String(36), primary_key=True)
-    name = db.Column(db.String(128), index=True)
-    description = db.Column(db.String(128))
-    message = db.Column(db.String(255), nullable=True)
-    import_id = db.Column(db.Integer, db.ForeignKey('candidate_imports.id'))
-    complete = db.Column(db.Boolean, default=False)
+class RqTaskMixin(object):
+    """ Task records share the id of the rq job executing them """
 
     @property
     def progress(self):
@@ -26,6 +19,40 @@ class ImportTask(db.Model):
             return None
         return rq_job
 
+    def is_active(self):
+        job = self.get_rq_job()
+        return job is not None and job.get_status() in ('queued', 'started', 'deferred')
+
     def get_progress(self):
         job = self.get_rq_job()
         return job.meta.get('progress', 0) if job is not None else 100
+
+
+class ImportTask(RqTaskMixin, db.Model):
+    __tablename__ = "import_tasks"
+
+    id = db.Column(db.String(36), primary_key=True)
+    name = db.Column(db.String(128), index=True)
+    description = db.Column(db.String(128))
+    message = db.Column(db.String(255), nullable=True)
+    import_id = db.Column(db.Integer, db.ForeignKey('candidate_imports.id'))
+    complete = db.Column(db.Boolean, default=False)
+
+    # byte range of the import file handled by this task and the offset of its last committed batch
+    start_offset = db.Column(db.BigInteger, nullable=True)
+    end_offset = db.Column(db.BigInteger, nullable=True)
+    checkpoint_offset = db.Column(db.BigInteger, nullable=True)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    duplicate_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class MailerTask(RqTaskMixin, db.Model):
+    __tablename__ = "mailer_tasks"
+
+    id = db.Column(db.String(36), primary_key=True)
+    name = db.Column(db.String(128), index=True)
+    description = db.Column(db.String(128))
+    message = db.Column(db.String(255), nullable=True)
+    campaign_id = db.Column(db.Integer, db.ForeignKey('campaigns.id'))
+    complete = db.Column(db.Boolean, default=False)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
@@ -1,10 +1,12 @@
 import datetime
 
 import jwt
+from flask import current_app
 from pytz import utc
 
 from app.main.config import key
 from app.main.model.blacklist import BlacklistToken
+from app.main.util.password_pool import run_password_hashing
 from .. import db, flask_bcrypt
 
 
@@ -33,10 +35,15 @@ class User(db.Model):
 
     @password.setter
     def password(self, password):
-        self.password_hash = flask_bcrypt.generate_password_hash(password).decode('utf-8')
+        rounds = current_app.config['BCRYPT_PASSWORD_ROUNDS']
+        self.password_hash = run_password_hashing(flask_bcrypt.generate_password_hash, password, rounds).decode('utf-8')
 
     def check_password(self, password):
-        return flask_bcrypt.check_password_hash(self.password_hash, password)
+        return run_password_hashing(flask_bcrypt.check_password_hash, self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """ Whether the password hash was made with a cost other than the configured one """
+        return _bcrypt_rounds(self.password_hash) != current_app.config['BCRYPT_PASSWORD_ROUNDS']
 
     def __repr__(self):
         return "<User '{}'>".format(self.username)
@@ -99,10 +106,11 @@ class UserPasswordReset(db.Model):
 
     @code.setter
     def code(self, code):
-        self.code_hash = flask_bcrypt.generate_password_hash(code).decode('utf-8')
+        rounds = current_app.config['BCRYPT_CODE_ROUNDS']
+        self.code_hash = run_password_hashing(flask_bcrypt.generate_password_hash, code, rounds).decode('utf-8')
 
     def check_code(self, code):
-        return flask_bcrypt.check_password_hash(self.code_hash, code)
+        return run_password_hashing(flask_bcrypt.check_password_hash, self.code_hash, code)
 
     def is_expired(self):
         now = datetime.datetime.now(tz=utc)
@@ -112,3 +120,11 @@ class UserPasswordReset(db.Model):
         if self.has_activated or duration.days >= 1:
             return True
         return False
+
+
+def _bcrypt_rounds(bcrypt_hash):
+    """ Cost factor of a modular crypt bcrypt hash, e.g. $2b$12$... -> 12 """
+    try:
+        return int(bcrypt_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
@@ -4,7 +4,8 @@ import uuid
 
 from app.main.model.user import User, UserPasswordReset
 from app.main.service.sms_service import sms_send_raw
-from app.main.service.user_service import save_changes
+from app.main.service.user_service import save_changes, get_principal
+from app.main.util.password_pool import PoolSaturatedError
 from app.main.util.validate import is_email
 from flask import current_app as app
 
@@ -27,6 +28,10 @@ class Auth:
         try:
             user = User.query.filter_by(username=data.get('username')).first()
             if user and user.check_password(data.get('password')):
+                if user.password_needs_rehash():
+                    # the configured cost changed since the password was set; upgrade while the plaintext is at hand
+                    user.password = data.get('password')
+                    save_changes(user)
                 auth_token = user.encode_auth_token(user.id)
                 if auth_token:
                     if user.require_2fa:
@@ -56,6 +61,14 @@ class Auth:
                 }
                 return response_object, 401
 
+        except PoolSaturatedError as e:
+            app.logger.warning(f'Rejected login, password hashing pool is full: {e}')
+            response_object = {
+                'status': 'fail',
+                'message': 'Too many logins in progress. Try again shortly.'
+            }
+            return response_object, 503
+
         except Exception as e:
             print(e)
             response_object = {
@@ -95,18 +108,14 @@ class Auth:
         if auth_token:
             resp = User.decode_auth_token(auth_token)
             if not isinstance(resp, str):
-                user = User.query.filter_by(id=resp).first()
-                response_object = {
-                    'status': 'success',
-                    'data': {
-                        'user_id': user.id,
-                        'username': user.username,
-                        'email': user.email,
-                        'admin': user.admin,
-                        'registered_on': str(user.registered_on)
+                principal = get_principal(resp)
+                if principal:
+                    response_object = {
+                        'status': 'success',
+                        'data': principal
                     }
-                }
-                return response_object, 200
+                    return response_object, 200
+                resp = 'User no longer exists. Please log in again.'
             response_object = {
                 'status': 'fail',
                 'message': resp
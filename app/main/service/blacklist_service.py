@@ -5,6 +5,8 @@ from app.main.model.blacklist import BlacklistToken
 def save_token(token):
     blacklist_token = BlacklistToken(token=token)
     try:
+        # cache the token first, so a logout reported as successful is always seen by the cached blacklist check
+        blacklist_token.cache()
         # insert the token
         db.session.add(blacklist_token)
         db.session.commit()
@@ -16,6 +18,6 @@ def save_token(token):
     except Exception as e:
         response_object = {
             'status': 'fail',
-            'message': e
+            'message': str(e)
         }
         return response_object, 200
\ No newline at end of file
@@ -2,7 +2,8 @@ import uuid
 import datetime
 
 from app.main import db
-from app.main.model.candidate import CandidateImport, Candidate
+from app.main.model.candidate import CandidateImport, Candidate, CandidateStatus, CandidateImportReject
+from app.main.util.candidate_csv import candidate_fingerprint
 
 
 def save_new_candidate(data):
@@ -36,6 +37,7 @@ def save_new_candidate(data):
         sav215=data.get('sav215'),
         sav15=data.get('sav15'),
         sav315=data.get('sav315'),
+        fingerprint=_fingerprint(data),
 
         inserted_on=datetime.datetime.utcnow(),
         import_record=data.get('import_record')
@@ -50,12 +52,67 @@ def save_new_candidate(data):
     return response_object, 201
 
 
+def add_new_candidates(candidates_data):
+    """ Bulk inserts a batch of candidates within the current transaction """
+    inserted_on = datetime.datetime.utcnow()
+    mappings = [_candidate_mapping(data, inserted_on) for data in candidates_data]
+    db.session.bulk_insert_mappings(Candidate, mappings)
+    return len(mappings)
+
+
+def _candidate_mapping(data, inserted_on):
+    import_record = data.get('import_record')
+    return dict(
+        public_id=str(uuid.uuid4()),
+        email=data.get('email'),
+        suffix=data.get('suffix'),
+        first_name=data.get('first_name'),
+        middle_initial=data.get('middle_initial'),
+        last_name=data.get('last_name'),
+        address=data.get('address'),
+        city=data.get('city'),
+        state=data.get('state'),
+        _zip=data.get('zip').zfill(5),
+        zip4=data.get('zip4'),
+        county=data.get('county'),
+        estimated_debt=data.get('estimated_debt'),
+        language=data.get('language'),
+        phone=data.get('phone'),
+
+        debt3=data.get('debt3'),
+        debt15=data.get('debt15'),
+        debt2=data.get('debt2'),
+        debt215=data.get('debt215'),
+        debt3_2=data.get('debt3_2'),
+        checkamt=data.get('checkamt'),
+        spellamt=data.get('spellamt'),
+        debt315=data.get('debt315'),
+        year_interest=data.get('year_interest'),
+        total_interest=data.get('total_interest'),
+        sav215=data.get('sav215'),
+        sav15=data.get('sav15'),
+        sav315=data.get('sav315'),
+        fingerprint=data.get('fingerprint') or _fingerprint(data),
+
+        status=CandidateStatus.IMPORTED,
+        inserted_on=inserted_on,
+        import_id=import_record.id if import_record else None
+    )
+
+
+def _fingerprint(data):
+    return candidate_fingerprint(data.get('first_name'), data.get('last_name'), data.get('address'), data.get('zip'),
+                                 data.get('suffix'))
+
+
 def update_candidate(public_id, data):
     candidate = Candidate.query.filter_by(public_id=public_id).first()
     if candidate:
         for attr in data:
             if hasattr(candidate, attr):
                 setattr(candidate, attr, data.get(attr))
+        candidate.fingerprint = candidate_fingerprint(candidate.first_name, candidate.last_name, candidate.address,
+                                                      candidate.zip5, candidate.suffix)
 
         save_changes(candidate)
 
@@ -76,6 +133,34 @@ def get_all_candidate_imports():
     return CandidateImport.query.all();
 
 
+def backfill_candidate_fingerprints(batch_size=1000):
+    """
+    Computes fingerprints for candidates stored before import deduplication existed, and recomputes those of
+    candidates with a suffix, which were fingerprinted without it before the suffix became part of the fingerprint
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        candidates = Candidate.query.with_entities(Candidate.id, Candidate.first_name, Candidate.last_name,
+                                                   Candidate.address, Candidate._zip, Candidate.suffix) \
+            .filter(Candidate.id > last_id, db.or_(Candidate.fingerprint.is_(None), Candidate.suffix != '')) \
+            .order_by(Candidate.id).limit(batch_size).all()
+        if not candidates:
+            return updated
+
+        db.session.bulk_update_mappings(Candidate, [
+            dict(id=candidate_id, fingerprint=candidate_fingerprint(first_name, last_name, address, zip_code, suffix))
+            for candidate_id, first_name, last_name, address, zip_code, suffix in candidates
+        ])
+        db.session.commit()
+        updated += len(candidates)
+        last_id = candidates[-1].id
+
+
+def get_candidate_import_rejects(candidate_import, page=1, per_page=50):
+    return candidate_import.rejects.order_by(CandidateImportReject.offset).paginate(page, per_page, False).items
+
+
 def get_all_candidates():
     return Candidate.query.paginate(1, 50, False).items
 
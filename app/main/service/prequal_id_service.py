@@ -0,0 +1,59 @@
+from os import path
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.main import db
+from app.main.config import prequal_id_counter_file
+from app.main.model.candidate import Candidate
+from app.main.util.prequal_id import format_prequal_id, parse_prequal_id
+
+SEQUENCE_KEY = 'prequal_id:sequence'
+
+
+class PrequalIdAllocator(object):
+    """
+    Hands out prequal ids from blocks reserved atomically with redis INCRBY, so mailer workers on any host
+    can assign ids concurrently without a shared lock. Ids left in a block when the allocator is dropped are skipped,
+    so blocks are sized down to the number of ids the caller expects to need.
+    """
+
+    def __init__(self, connection=None, block_size=None, needed=None):
+        """ :param needed: ids the caller expects to assign; None reserves whole blocks """
+        self.redis = connection or current_app.redis
+        self.block_size = block_size or current_app.config['PREQUAL_ID_BLOCK_SIZE']
+        self.needed = needed
+        self._next = 1
+        self._end = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._next > self._end:
+            self._reserve()
+        ordinal = self._next
+        self._next += 1
+        if self.needed is not None:
+            self.needed -= 1
+        return format_prequal_id(ordinal)
+
+    def _reserve(self):
+        if not self.redis.exists(SEQUENCE_KEY):
+            self.redis.setnx(SEQUENCE_KEY, _seed_ordinal())
+        size = self.block_size if self.needed is None else max(1, min(self.block_size, self.needed))
+        self._end = self.redis.incrby(SEQUENCE_KEY, size)
+        self._next = self._end - size + 1
+
+
+def _seed_ordinal():
+    """ Continues after the highest id issued by the file based counter or already stored on a candidate """
+    issued = [0]
+    if path.isfile(prequal_id_counter_file):
+        with open(prequal_id_counter_file) as counter:
+            issued.append(parse_prequal_id(counter.read()))
+
+    latest = db.session.query(func.max(Candidate.prequal_number)).scalar()
+    if latest:
+        issued.append(parse_prequal_id(latest))
+    return max(issued)
@@ -2,7 +2,12 @@ import uuid
 import datetime
 
 from app.main import db
+from app.main.config import principal_cache_size, principal_cache_ttl
 from app.main.model.user import User
+from app.main.util.cache import TTLCache
+
+# identity of recently authenticated users by id; another process sees an update_user after at most the ttl
+_principals = TTLCache(maxsize=principal_cache_size, ttl=principal_cache_ttl)
 
 
 def save_new_user(data, is_admin=False):
@@ -43,6 +48,7 @@ def update_user(public_id, data, is_admin=None):
             user.admin = is_admin
 
         save_changes(user)
+        _principals.pop(user.id)
 
         response_object = {
             'success': True,
@@ -65,6 +71,27 @@ def get_a_user(public_id):
     return User.query.filter_by(public_id=public_id).first()
 
 
+def get_principal(user_id):
+    """
+    Identity of a user as exposed to token protected endpoints, served from a short lived per-process cache
+    :return: dict, or None when the user does not exist
+    """
+    principal = _principals.get(user_id)
+    if principal is None:
+        user = User.query.filter_by(id=user_id).first()
+        if not user:
+            return None
+        principal = {
+            'user_id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'admin': user.admin,
+            'registered_on': str(user.registered_on)
+        }
+        _principals.set(user_id, principal)
+    return dict(principal)
+
+
 def save_changes(*data):
     for entry in data:
         db.session.add(entry)
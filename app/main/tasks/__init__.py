@@ -1,120 +1,200 @@
 import csv
+import os
 
-from rq import get_current_job
-import inflect
+from sqlalchemy import func, or_
 
 from app.main import db
-from app.main.model.candidate import CandidateImport, CandidateImportStatus
-from app.main.model.task import ImportTask
-from app.main.service.candidate_service import save_new_candidate
+from app.main.model.campaign import Campaign
+from app.main.model.candidate import CandidateImport, Candidate
+from app.main.tasks.candidate_batch import CandidateBatch
+from app.main.tasks.progress import CandidateImportProgress, TaskProgress
+from app.main.util.candidate_csv import compile_header, MissingColumnsError
+from app.main.util.csv_stream import ByteCountingLineReader
 from flask import current_app as app
 
 
-def _set_task_progress(import_request, progress, success=True, message=''):
-    job = get_current_job()
-    if job:
-        job.meta['progress'] = progress
-    job.save_meta()
-    task = ImportTask.query.get(job.get_id())
+def parse_candidate_file(import_id, start_offset=None, end_offset=None):
+    """
+    Imports a candidate file, or only the byte range [start_offset, end_offset) of it when split across workers
+    A start_offset without an end_offset continues a whole-file import from that offset to the end of the file
+    """
+    app.logger.debug('Executing parse_candidate_file...')
+    import_request = CandidateImport.query.get(import_id)  # type: CandidateImport
+    progress = CandidateImportProgress(import_request, final=end_offset is None)
+    progress.start()
 
-    if progress >= 100:
-        task.complete = True
-        job.meta['message'] = message
-        import_request.status = CandidateImportStatus.FINISHED if success else CandidateImportStatus.ERROR
+    app.logger.info(f'Importing {import_request.file}...')
+    with open(import_request.file, 'rb') as csvfile:
+        if start_offset is None:
+            return import_candidate_stream(import_request, csvfile, progress)
 
-    elif not success:
-        task.complete = True
-        task.message = message
-        import_request.status = CandidateImportStatus.ERROR
+        header = csvfile.readline()
+        if end_offset is None:
+            end_offset = os.fstat(csvfile.fileno()).st_size
+        csvfile.seek(start_offset)
+        app.logger.info(f'Importing bytes {start_offset}-{end_offset}')
+        return import_candidate_stream(import_request, csvfile, progress, total_size=end_offset - start_offset,
+                                       header=header, offset=start_offset)
 
-    else:
-        import_request.status = CandidateImportStatus.RUNNING
-    db.session.commit()
 
-
-def parse_candidate_file(import_id):
-    app.logger.debug('Executing parse_candidate_file...')
+def finalize_candidate_import(import_id):
+    """ Aggregates the results of chunked parse_candidate_file jobs once all of them have run """
     import_request = CandidateImport.query.get(import_id)  # type: CandidateImport
-    _set_task_progress(import_request, 0)
+    progress = CandidateImportProgress(import_request)
+    progress.start()
+
+    chunk_tasks = import_request.tasks.filter_by(name='parse_candidate_file').all()
+    failed = [task for task in chunk_tasks if not task.complete or task.message]
+    if failed:
+        progress.fail(f'{len(failed)} of {len(chunk_tasks)} file chunks failed')
+        return
+
+    _update_import_counts(import_request, sum(task.row_count for task in chunk_tasks),
+                          sum(task.duplicate_count for task in chunk_tasks))
+    app.logger.info(f'{import_request.imported_count} records imported from {len(chunk_tasks)} file chunks')
+    progress.finish()
+    return import_request.imported_count
+
+
+def assign_import_to_campaign(import_id, campaign_id):
+    """
+    Moves the candidates of an import onto a campaign one id range at a time, committing each range
+    so the update never locks the whole import at once
+    :return: number of candidates assigned
+    """
+    campaign = Campaign.query.get(campaign_id)
+    progress = TaskProgress()
+    progress.start()
+
+    candidates = Candidate.query.filter_by(import_id=import_id)
+    first_id, last_id = candidates.with_entities(func.min(Candidate.id), func.max(Candidate.id)).one()
+    if first_id is None:
+        progress.finish('Candidate import has no candidates')
+        return 0
 
-    app.logger.info(f'Importing {import_request.file}...')
-    with open(import_request.file, 'r') as csvfile:
-        p = inflect.engine()
-        csvreader = csv.reader(csvfile, delimiter=',')
-        row_count = sum(1 for line in csvfile) - 1
-        csvfile.seek(0)
-        app.logger.info(f'{row_count} records identified for import')
-
-        fields = csvreader.__next__()
-        app.logger.debug(f'Column names are {", ".join(fields)}')
-        keys = [key.upper() for key in fields]
-
-        line_num = 0
+    # candidates leaving a campaign, or joining one below its export watermark, need a full mailer rewrite
+    previous_campaigns = candidates.filter(Candidate.campaign_id != campaign.id) \
+        .with_entities(Candidate.campaign_id).distinct().statement
+    Campaign.query.filter(Campaign.id.in_(previous_campaigns)) \
+        .update({Campaign.mailer_exported_id: None, Campaign.mailer_resets: Campaign.mailer_resets + 1},
+                synchronize_session=False)
+    campaign.reset_mailer_watermark(first_id)
+    db.session.commit()
+
+    batch_size = app.config['CANDIDATE_ASSIGN_BATCH_SIZE']
+    assigned = 0
+    try:
+        for start in range(first_id, last_id + 1, batch_size):
+            end = start + batch_size
+            assigned += _assign_candidate_range(candidates.filter(Candidate.id >= start, Candidate.id < end), campaign)
+            if progress.task:
+                progress.task.row_count = assigned
+            db.session.commit()
+            progress.update(min(end - first_id, last_id - first_id + 1) / (last_id - first_id + 1) * 100)
+    except Exception as e:
+        db.session.rollback()
+        progress.fail(str(e))
+        return
+
+    app.logger.info(f'{assigned} candidates assigned to campaign {campaign_id}')
+    progress.finish(f'{assigned} candidates assigned')
+    return assigned
+
+
+def _assign_candidate_range(candidates, campaign):
+    """ Moves candidates not yet on the campaign onto it, keeping the campaigns' cached candidate counts in step """
+    moving = candidates.filter(or_(Candidate.campaign_id != campaign.id, Candidate.campaign_id.is_(None)))
+    sources = moving.with_entities(Candidate.campaign_id, func.count(Candidate.id)) \
+        .group_by(Candidate.campaign_id).all()
+    moved = moving.update({Candidate.campaign_id: campaign.id}, synchronize_session=False)
+
+    for source_id, count in sources:
+        if source_id is not None:
+            Campaign.query.filter_by(id=source_id) \
+                .update({Campaign.candidate_count: Campaign.candidate_count - count}, synchronize_session=False)
+    Campaign.query.filter_by(id=campaign.id) \
+        .update({Campaign.candidate_count: Campaign.candidate_count + moved}, synchronize_session=False)
+    return moved
+
+
+def import_candidate_stream(import_request, stream, progress, total_size=None, header=None, offset=0):
+    """
+    Imports candidates from a binary CSV stream, reading it exactly once
+    When a header is given the stream is a byte range of the file, starting at offset, limited to total_size bytes
+    Each committed batch records the file offset it reached as the task checkpoint
+    :return: number of candidates imported
+    """
+    batch_size = app.config['CANDIDATE_IMPORT_BATCH_SIZE']
+    batch = CandidateBatch(import_request, progress.task)
+
+    lines = ByteCountingLineReader(stream, total_size, limit=total_size if header else None)
+    csvreader = csv.reader(lines, delimiter=',')
+
+    fields = next(csv.reader([header.decode(lines.encoding, errors='replace')])) if header else next(csvreader, None)
+    if not fields:
+        progress.fail('Candidate file is empty')
+        return
+
+    app.logger.debug(f'Column names are {", ".join(fields)}')
+    try:
+        project = compile_header(fields)
+    except MissingColumnsError as e:
+        progress.fail(str(e))
+        return
+    lines.pop_decode_error()
+
+    imported = 0
+    row_offset = offset + lines.bytes_read
+    try:
         for row in csvreader:
-            try:
-                estimated_debt_str = row[keys.index('EST RVLV')].replace(',', '')
-                estimated_debt = convert_to_int(estimated_debt_str)
-                debt3 = round(0.03 * estimated_debt)
-                debt15 = round((estimated_debt + (estimated_debt * 0.06)) / 60)
-                debt2 = estimated_debt - 5000
-                debt215 = round((debt2 + (debt2 * 0.06)) / 60)
-                debt3_2 = estimated_debt + 5000
-                checkamt = estimated_debt + 5000
-                spellamt = '{} {}'.format(p.number_to_words(checkamt).title(), 'Dollars and No Cents')
-                debt315 = round((debt3_2 + (debt3_2 * 0.06)) / 60)
-                year_interest = round(estimated_debt * 0.1899)
-                total_interest = year_interest * 22
-                sav215 = round((((debt2 * 0.03) - debt215) * 12) - 4)
-                sav15 = (debt3 * 12) - (debt15 * 12)
-                sav315 = (((debt3_2 * 0.03) - debt315) * 12) + 4
-
-                data = {
-                    'suffix': row[keys.index('SUFFIX')],
-                    'first_name': row[keys.index('FNAME')],
-                    'last_name': row[keys.index('LNAME')],
-                    'middle_initial': row[keys.index('MI')],
-                    'email': None,
-                    'language': 'unknown',
-                    'phone': None,
-                    'address': row[keys.index('ADDRESS')],
-                    'city': row[keys.index('CITY')],
-                    'state': row[keys.index('STATE')],
-                    'zip': row[keys.index('ZIP')],
-                    'zip4': row[keys.index('ZIP4')],
-                    'estimated_debt': estimated_debt,
-                    'debt3': debt3,
-                    'debt15': debt15,
-                    'debt2': debt2,
-                    'debt215': debt215,
-                    'debt3_2': debt3_2,
-                    'checkamt': checkamt,
-                    'spellamt': spellamt,
-                    'debt315': debt315,
-                    'year_interest': year_interest,
-                    'total_interest': total_interest,
-                    'sav215': sav215,
-                    'sav15': sav15,
-                    'sav315': sav315,
-                    'import_record': import_request
-                }
-                result, _ = save_new_candidate(data)
-                if 'success' == result['status']:
-                    # app.logger.debug('{first_name} {last_name} was saved successfully'.format(**data))
-                    pass
-                # else:
-                # app.logger.info('{first_name} {last_name} failed to save'.format(**data))
-                # app.logger.info(result['message'])
-
-                line_num += 1
-                _set_task_progress(import_request, (line_num / row_count) * 100)
-            except ValueError as ve:
-                _set_task_progress(import_request, (line_num / row_count) * 100, False, str(ve))
-                return
-            except Exception as e:
-                _set_task_progress(import_request, (line_num / row_count) * 100, False, str(e))
-                return
-
-    _set_task_progress(import_request, 100)
+            # line numbers are only meaningful when reading from the top of the file
+            source = (None if header else csvreader.line_num, row_offset, row)
+            decode_error = lines.pop_decode_error()
+            if decode_error:
+                batch.reject(source, decode_error)
+            elif row:
+                _add_row(batch, project, row, source, len(fields), import_request)
+            row_offset = offset + lines.bytes_read
+
+            if len(batch) >= batch_size:
+                imported += batch.save(progress, row_offset)
+            progress.update(lines.progress)
+
+        if len(batch):
+            imported += batch.save(progress, row_offset)
+    except Exception as e:
+        db.session.rollback()
+        progress.fail(str(e))
+        return
+
+    app.logger.info(f'{imported} records imported')
+    if progress.final:
+        _update_import_counts(import_request, *progress.row_counts())
+    progress.finish()
+    return imported
+
+
+def _add_row(batch, project, row, source, columns, import_request):
+    try:
+        data = project(row)
+    except IndexError:
+        batch.reject(source, f'Expected {columns} columns, found {len(row)}')
+        return
+
+    data.update({
+        'email': None,
+        'language': 'unknown',
+        'phone': None,
+        'estimated_debt': convert_to_int(data['estimated_debt'].replace(',', '')),
+        'import_record': import_request
+    })
+    batch.add(data, source)
+
+
+def _update_import_counts(import_request, imported, duplicates):
+    import_request.imported_count = imported
+    import_request.duplicate_count = duplicates
+    import_request.rejected_count = import_request.rejects.count()
 
 
 def convert_to_int(value):
@@ -1,121 +1,234 @@
 import csv
+import gzip
 import os
 import uuid
+from contextlib import ExitStack
+from operator import attrgetter
 from os import path
 
 from flask import current_app as app
-from filelock import FileLock
 
 from app.main import db
-from app.main.config import upload_location, prequal_id_counter_lock_file, prequal_id_counter_file
+from app.main.config import upload_location
 from app.main.model.campaign import Campaign
+from app.main.model.candidate import Candidate
+from app.main.service.prequal_id_service import PrequalIdAllocator
+from app.main.tasks.progress import MailerFileProgress
 
 
-def _set_latest_prequal_id(value):
-    lock = FileLock(prequal_id_counter_lock_file)
-    with lock:
-        open(prequal_id_counter_file, "w").write()
+def _money(value):
+    return "${:0,.0f}".format(value)
 
 
-def _get_latest_prequal_id():
-    lock = FileLock(prequal_id_counter_lock_file)
-    with lock:
-        if not path.isfile(prequal_id_counter_file):
-            return None
-        else:
-            open(prequal_id_counter_file, "r").read()
+MAILER_MAPPING = {'candidate.first_name': 'first', 'candidate.last_name': 'last', 'candidate.address': 'address',
+                  'candidate.city': 'city', 'candidate.state': 'st', 'candidate.zip5': 'zip',
+                  'campaign.phone': 'phone_numb', 'campaign.job_number': 'job_number',
+                  'campaign.mailing_date': 'mailing_da', 'campaign.offer_expire_date': 'offer_expi',
+                  'candidate.prequal_number': 'prequal', 'candidate.estimated_debt': 'debt',
+                  'candidate.debt3': 'debt3', 'candidate.debt15': 'debt15', 'candidate.debt2': 'debt2',
+                  'candidate.debt215': 'debt215', 'candidate.debt3_2': 'debt3_2', 'candidate.checkamt': 'checkamt',
+                  'candidate.spellamt': 'spellamt', 'candidate.debt315': 'debt315',
+                  'candidate.year_interest': 'int_yr', 'candidate.total_interest': 'tot_int',
+                  'candidate.sav215': 'sav215', 'candidate.sav15': 'sav15', 'candidate.sav315': 'sav315'}
+
+MAILER_FILTERS = {'debt': _money, 'debt3': _money, 'debt15': _money, 'debt2': _money, 'debt215': _money,
+                  'debt3_2': _money, 'checkamt': _money, 'debt315': _money, 'int_yr': _money, 'tot_int': _money,
+                  'sav215': _money, 'sav15': _money, 'sav315': _money}
 
+COMPRESSED_SUFFIX = '.gz'
 
-def generate_mailer_file(campaign_id):
+# mapped candidate properties which are backed by a differently named column
+_CANDIDATE_COLUMN_ALIASES = {'zip5': '_zip'}
+
+
+def generate_mailer_file(campaign_id, incremental=False, delta=False, compress=None):
+    """
+    Writes the campaign mailer file, assigning prequal numbers to candidates which have none yet
+    :param incremental: append only candidates added since the last export; falls back to a full rewrite
+                        when there is no previous file or its watermark was reset
+    :param delta: in incremental mode, also write the appended candidates to a separate delta file
+    :param compress: gzip the output while writing it; None keeps the format of the existing mailer file
+    """
     app.logger.info('Executing generate_mailer_file...')
     campaign = Campaign.query.get(campaign_id)
+    progress = MailerFileProgress()
+    progress.start()
+    if compress is None:
+        compress = _is_compressed(campaign.mailer_file)
+    mapping, filters = MAILER_MAPPING, MAILER_FILTERS
+
+    # select only the mapped columns as tuples instead of hydrating Candidate entities
+    batch_size = app.config['MAILER_FILE_BATCH_SIZE']
+    query = campaign.candidates.with_entities(*_candidate_columns(mapping))
+    prequal_column = list(mapping).index('candidate.prequal_number')
+
+    file_path = _get_mailer_file(campaign, compress)
+    resets = campaign.mailer_resets
+    incremental = incremental and campaign.mailer_exported_id is not None and file_path == campaign.mailer_file
+    last_id = campaign.mailer_exported_id if incremental else 0
+    delta_path = _new_mailer_file_path(compress) if incremental and delta else None
+    total = query.filter(Candidate.id > last_id).count() if incremental else campaign.candidate_count
+
+    # until this export succeeds the mailer file cannot be trusted to end at the watermark, and the previous
+    # delta file is superseded by this run whether or not it writes a new one
+    previous_delta = campaign.mailer_delta_file
+    campaign.mailer_exported_id = None
+    campaign.mailer_delta_file = None
+    db.session.commit()
+    _remove_file(previous_delta)
+
+    # full rewrites go to a temporary file which replaces the mailer file only once complete
+    write_path = file_path if incremental else _temporary_path(file_path)
+
+    # reserve only as many ids as the export can assign, rather than a whole block per run
+    prequal_ids = PrequalIdAllocator(
+        needed=query.filter(Candidate.id > last_id, Candidate.prequal_number.is_(None)).count())
+    project = _compile_row_projector(mapping, filters, campaign)
+
+    exported = 0
+    try:
+        with ExitStack() as files:
+            writers = [_open_mailer_writer(files, write_path, mapping, compress, append=incremental)]
+            if delta_path:
+                writers.append(_open_mailer_writer(files, delta_path, mapping, compress))
+
+            for rows in _candidate_batches(query, batch_size, last_id):
+                records, assigned = [], []
+                for row in rows:
+                    record = project(row)
+                    if not row.prequal_number:
+                        prequal_number = next(prequal_ids)
+                        record[prequal_column] = prequal_number
+                        assigned.append({'id': row.id, 'prequal_number': prequal_number})
+                    records.append(record)
+
+                for writer in writers:
+                    writer.writerows(records)
+                last_id = rows[-1].id
+                exported += len(rows)
+                progress.checkpoint(exported)
+                if assigned:
+                    # persist each chunk's prequal numbers on its own so row locks are released as the export goes
+                    db.session.bulk_update_mappings(Candidate, assigned)
+                    db.session.commit()
+                progress.update(min(exported / total, 1) * 100 if total else 0, len(rows))
+    except Exception as e:
+        db.session.rollback()
+        progress.fail(str(e))
+        _remove_file(delta_path)
+        if write_path != file_path:
+            _remove_file(write_path)
+        return
+
+    if write_path != file_path:
+        os.replace(write_path, file_path)
+    replaced_file = campaign.mailer_file if campaign.mailer_file != file_path else None
+    campaign.mailer_file = file_path
+    if delta_path:
+        campaign.mailer_delta_file = delta_path
+    # candidates may have joined or left below the pages already written if the watermark was reset meanwhile,
+    # in which case it stays unset and the next export rewrites the whole file
+    Campaign.query.filter_by(id=campaign.id, mailer_resets=resets) \
+        .update({Campaign.mailer_exported_id: last_id}, synchronize_session=False)
+    progress.finish(f'{exported} candidates exported')
+
+    _remove_file(replaced_file)
+    return exported
+
+
+def _open_mailer_writer(files, file_path, mapping, compress, append=False):
+    # appending to a gzip file adds another gzip member, which readers decompress as one continuous stream
+    opener = gzip.open if compress else open
+    writer = csv.writer(files.enter_context(opener(file_path, 'at' if append else 'wt')), quoting=csv.QUOTE_ALL)
+    if not append:
+        writer.writerow(mapping.values())
+    return writer
+
+
+def _candidate_batches(query, batch_size, last_id=0):
+    """ Pages through the candidates after last_id, so chunks can be committed without holding a cursor open """
+    while True:
+        rows = query.filter(Candidate.id > last_id).order_by(Candidate.id).limit(batch_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _candidate_columns(mapping):
+    """ Column expressions for the candidate attributes used by the mapping, labelled by attribute name """
+    columns = [Candidate.id]
+    for source in mapping:
+        model, attr = source.split('.')
+        if model == 'candidate' and hasattr(Candidate, attr):
+            column = getattr(Candidate, _CANDIDATE_COLUMN_ALIASES.get(attr, attr))
+            columns.append(column.label(attr))
+    return columns
+
+
+def _compile_row_projector(mapping, filters, campaign):
+    """
+    Resolves the mapping once into one accessor per column, formatted by its filter
+    Campaign columns are constant for the whole file so they are evaluated here rather than per row
+    :return: function(candidate row) -> list of column values in mapping order
+    """
+    columns = []
+    for source, key in mapping.items():
+        model, attr = source.split('.')
+        formatter = filters.get(key)
+        if model == 'candidate' and hasattr(Candidate, attr):
+            getter = attrgetter(attr)
+            columns.append(_formatted(getter, formatter) if formatter else getter)
+        elif model == 'candidate':
+            columns.append(_constant(_filter(filters, key, 'MISSING_VALUE')))
+        elif model == 'campaign':
+            columns.append(_constant(_filter(filters, key, getattr(campaign, attr, 'MISSING_VALUE'))))
+        else:
+            columns.append(_constant('UNKNOWN_SOURCE_VALUE'))
 
-    candidates = campaign.candidates.all()
+    def project(candidate):
+        return [column(candidate) for column in columns]
 
-    mapping = {'candidate.first_name': 'first', 'candidate.last_name': 'last', 'candidate.address': 'address',
-               'candidate.city': 'city', 'candidate.state': 'st', 'candidate.zip5': 'zip',
-               'campaign.phone': 'phone_numb', 'campaign.job_number': 'job_number',
-               'campaign.mailing_date': 'mailing_da', 'campaign.offer_expire_date': 'offer_expi',
-               'candidate.prequal_number': 'prequal', 'candidate.estimated_debt': 'debt', 'candidate.debt3': 'debt3',
-               'candidate.debt15': 'debt15', 'candidate.debt2': 'debt2', 'candidate.debt215': 'debt215',
-               'candidate.debt3_2': 'debt3_2', 'candidate.checkamt': 'checkamt', 'candidate.spellamt': 'spellamt',
-               'candidate.debt315': 'debt315', 'candidate.year_interest': 'int_yr',
-               'candidate.total_interest': 'tot_int', 'candidate.sav215': 'sav215', 'candidate.sav15': 'sav15',
-               'candidate.sav315': 'sav315'}
+    return project
 
-    filters = {'debt': _money, 'debt3': _money, 'debt15': _money, 'debt2': _money, 'debt215': _money, 'debt3_2': _money,
-               'checkamt': _money, 'debt315': _money, 'int_yr': _money, 'tot_int': _money, 'sav215': _money,
-               'sav15': _money, 'sav315': _money}
 
-    try:
-        file_path = _get_mailer_file(campaign)
-
-        lock = FileLock(prequal_id_counter_lock_file)
-        with lock:
-            if not path.isfile(prequal_id_counter_file):
-                latest_prequal_id = 'A10000'
-            else:
-                latest_prequal_id = open(prequal_id_counter_file, "r").read()
-
-            gen_prequal_func = _generate_prequal_id(latest_prequal_id)
-
-            with open(file_path, 'w') as csvFile:
-                writer = csv.DictWriter(csvFile, fieldnames=mapping.values(), quoting=csv.QUOTE_ALL)
-                writer.writeheader()
-
-                for candidate in candidates:
-                    record = {}
-                    if not candidate.prequal_number:
-                        try:
-                            latest_prequal_id = next(gen_prequal_func)
-                        except StopIteration:
-                            letter, number = latest_prequal_id[:1], latest_prequal_id[1:]
-                            new_prequal_id = f'{chr(ord(letter) + 1)}10000'
-                            gen_prequal_func = _generate_prequal_id(new_prequal_id)
-                            latest_prequal_id = next(gen_prequal_func)
-
-                        candidate.prequal_number = latest_prequal_id
-
-                    for source, key in mapping.items():
-                        model, attr = source.split('.')
-                        if model == 'candidate':
-                            record[key] = _filter(filters, key, getattr(candidate, attr, 'MISSING_VALUE'))
-                        elif model == 'campaign':
-                            record[key] = _filter(filters, key, getattr(campaign, attr, 'MISSING_VALUE'))
-                        else:
-                            record[key] = 'UNKNOWN_SOURCE_VALUE'
-
-                    writer.writerow(record)
-
-            campaign.mailer_file = file_path
-            open(prequal_id_counter_file, 'w').write(latest_prequal_id)
-            db.session.commit()
-    finally:
-        csvFile.close()
-
-
-def _get_mailer_file(campaign):
-    if campaign.mailer_file and path.isfile(campaign.mailer_file):
+def _formatted(getter, formatter):
+    return lambda candidate: formatter(getter(candidate))
+
+
+def _constant(value):
+    return lambda candidate: value
+
+
+def _get_mailer_file(campaign, compress=False):
+    if campaign.mailer_file and path.isfile(campaign.mailer_file) and _is_compressed(campaign.mailer_file) == compress:
         file_path = campaign.mailer_file
     else:
-        filename = f'{uuid.uuid4()}.csv'
-        file_path = os.path.join(upload_location, filename)
+        file_path = _new_mailer_file_path(compress)
     return file_path
 
 
-def _filter(filter_mapping, key, value):
-    if key in filter_mapping:
-        return filter_mapping[key](value)
-    else:
-        return value
+def _new_mailer_file_path(compress=False):
+    filename = f'{uuid.uuid4()}.csv{COMPRESSED_SUFFIX if compress else ""}'
+    return os.path.join(upload_location, filename)
 
 
-def _money(value):
-    return "${:0,.0f}".format(value)
+def _temporary_path(file_path):
+    directory, filename = path.split(file_path)
+    return path.join(directory, f'.{filename}.part')
+
 
+def _remove_file(file_path):
+    if file_path and path.isfile(file_path):
+        os.remove(file_path)
 
-def _generate_prequal_id(latest_prequal_id, max_int=100000):
-    letter, number = latest_prequal_id[:1], latest_prequal_id[1:]
 
-    for i in range(int(number) + 1, max_int):
-        yield f'{letter}{i}'
+def _is_compressed(file_path):
+    return bool(file_path) and file_path.endswith(COMPRESSED_SUFFIX)
+
+
+def _filter(filter_mapping, key, value):
+    if key in filter_mapping:
+        return filter_mapping[key](value)
+    else:
+        return value
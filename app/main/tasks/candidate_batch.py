@@ -0,0 +1,162 @@
+import csv
+import datetime
+import io
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main import db
+from app.main.model.candidate import Candidate, CandidateImportReject
+from app.main.service.candidate_service import add_new_candidates
+from app.main.util.amount_words import spell_amount
+from app.main.util.candidate_csv import candidate_fingerprint
+from app.main.util.offers import compute_offers
+
+REQUIRED_FIELDS = ('first_name', 'last_name', 'address', 'city', 'state', 'zip')
+# offer columns derived from the debt reach about 4.2x of it and must still fit the 32 bit Integer columns
+MAX_ESTIMATED_DEBT = (2 ** 31 - 1) // 5
+
+
+def _column_lengths():
+    lengths = {}
+    for column in Candidate.__table__.columns:
+        length = getattr(column.type, 'length', None)
+        if length is None and isinstance(column.type, db.CHAR):
+            length = 1
+        if length:
+            lengths[column.name] = length
+    return lengths
+
+
+COLUMN_LENGTHS = _column_lengths()
+
+
+def validate_candidate(data):
+    """
+    Checks a parsed candidate record against the candidates table constraints
+    :return: reason the record would be rejected, or None when it is valid
+    """
+    missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+    if missing:
+        return f'Missing required values: {", ".join(missing)}'
+
+    if not 0 <= data.get('estimated_debt', 0) <= MAX_ESTIMATED_DEBT:
+        return f'estimated_debt must be between 0 and {MAX_ESTIMATED_DEBT}'
+
+    for field, length in COLUMN_LENGTHS.items():
+        value = data.get(field)
+        if isinstance(value, str) and len(value) > length:
+            return f'{field} exceeds {length} characters'
+    return None
+
+
+class CandidateBatch(object):
+    """
+    Buffers parsed and rejected candidate rows so they are committed together with the task checkpoint
+    Candidates already seen by this job, or already stored from an earlier upload, are skipped as duplicates
+    """
+
+    def __init__(self, import_request, task=None):
+        self.import_request = import_request
+        self.task = task
+        self.rows = []
+        self.sources = []
+        self.rejects = []
+        self.duplicates = 0
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.rows) + len(self.rejects) + self.duplicates
+
+    def add(self, data, source):
+        """ :param source: (line number, byte offset, raw row) locating the record in the import file """
+        reason = validate_candidate(data)
+        if reason:
+            self.reject(source, reason)
+            return
+
+        fingerprint = candidate_fingerprint(data['first_name'], data['last_name'], data['address'], data['zip'],
+                                            data.get('suffix'))
+        if fingerprint in self.seen:
+            self.duplicates += 1
+            return
+
+        self.seen.add(fingerprint)
+        data['fingerprint'] = fingerprint
+        self.rows.append(data)
+        self.sources.append(source)
+
+    def reject(self, source, reason):
+        line_number, offset, row = source
+        self.rejects.append(CandidateImportReject(
+            import_id=self.import_request.id,
+            task_id=self.task.id if self.task else None,
+            line_number=line_number,
+            offset=offset,
+            reason=reason[:255],
+            row=_format_row(row),
+            inserted_on=datetime.datetime.utcnow()
+        ))
+
+    def save(self, progress, offset):
+        """
+        Inserts buffered rows and rejects in one transaction, checkpointing the task at offset
+        If the database refuses the batch, rows are retried one at a time and the failing ones rejected
+        :return: number of candidates inserted
+        """
+        self._skip_stored_duplicates()
+        _apply_offers(self.rows)
+        try:
+            saved = add_new_candidates(self.rows) if self.rows else 0
+            self._commit(progress, offset, saved)
+        except SQLAlchemyError:
+            db.session.rollback()
+            saved = self._insert_isolated()
+            self._commit(progress, offset, saved)
+
+        self.rows, self.sources, self.rejects, self.duplicates = [], [], [], 0
+        return saved
+
+    def _skip_stored_duplicates(self):
+        fingerprints = [data['fingerprint'] for data in self.rows]
+        if not fingerprints:
+            return
+
+        stored = {fingerprint for fingerprint, in
+                  db.session.query(Candidate.fingerprint).filter(Candidate.fingerprint.in_(fingerprints))}
+        if stored:
+            kept = [(data, source) for data, source in zip(self.rows, self.sources)
+                    if data['fingerprint'] not in stored]
+            self.duplicates += len(self.rows) - len(kept)
+            self.rows = [data for data, _ in kept]
+            self.sources = [source for _, source in kept]
+
+    def _commit(self, progress, offset, saved):
+        db.session.add_all(self.rejects)
+        progress.checkpoint(offset, saved, self.duplicates)
+        db.session.commit()
+
+    def _insert_isolated(self):
+        saved = 0
+        for data, source in zip(self.rows, self.sources):
+            try:
+                with db.session.begin_nested():
+                    saved += add_new_candidates([data])
+            except SQLAlchemyError as e:
+                self.reject(source, str(getattr(e, 'orig', None) or e))
+        return saved
+
+
+def _apply_offers(rows):
+    if not rows:
+        return
+    offers = compute_offers([data['estimated_debt'] for data in rows])
+    columns = offers.keys()
+    for data, *values in zip(rows, *offers.values()):
+        data.update(zip(columns, values))
+        data['spellamt'] = spell_amount(data['checkamt'])
+
+
+def _format_row(row):
+    line = io.StringIO()
+    csv.writer(line).writerow(row)
+    return line.getvalue().rstrip('\r\n')
@@ -0,0 +1,125 @@
+import time
+
+from rq import get_current_job
+
+from app.main import db
+from app.main.model.candidate import CandidateImportStatus
+from app.main.model.task import ImportTask, MailerTask
+
+
+class TaskProgress(object):
+    """ Coalesces rq job progress updates; only task state transitions are committed to the db """
+    task_model = ImportTask
+
+    def __init__(self, interval=0.5, every=None):
+        self.job = get_current_job()
+        self._task = None
+        self.interval = interval
+        self.every = every
+        self.progress = 0
+        self._pending = 0
+        self._flushed_at = 0.0
+
+    @property
+    def task(self):
+        """ Task row of the running job, looked up again until found in case the job started before it was committed """
+        if self._task is None and self.job:
+            self._task = self.task_model.query.get(self.job.get_id())
+        return self._task
+
+    def start(self):
+        self._on_running()
+        db.session.commit()
+        self._save_meta(progress=0)
+
+    def update(self, progress, steps=1):
+        self.progress = progress
+        self._pending += steps
+
+        now = time.monotonic()
+        if now - self._flushed_at >= self.interval or (self.every and self._pending >= self.every):
+            self._save_meta(progress=progress)
+
+    def finish(self, message=''):
+        if self.task:
+            self.task.complete = True
+        self._on_finished()
+        db.session.commit()
+        self._save_meta(progress=100, message=message)
+
+    def fail(self, message):
+        if self.task:
+            self.task.complete = True
+            self.task.message = message
+        self._on_error()
+        db.session.commit()
+        self._save_meta(progress=self.progress, message=message)
+
+    def _save_meta(self, **meta):
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        if self.job:
+            self.job.meta.update(meta)
+            self.job.save_meta()
+
+    def _on_running(self):
+        pass
+
+    def _on_finished(self):
+        pass
+
+    def _on_error(self):
+        pass
+
+
+class CandidateImportProgress(TaskProgress):
+    """
+    Task progress which mirrors state transitions onto the candidate import record
+    Non-final tasks (file chunks) leave marking the import FINISHED to the finalizer task
+    """
+
+    def __init__(self, import_request, final=True, **kwargs):
+        super().__init__(**kwargs)
+        self.import_request = import_request
+        self.final = final
+        self._committed_rows = 0
+        self._duplicate_rows = 0
+
+    def checkpoint(self, offset, rows, duplicates=0):
+        """ Records rows committed up to a file offset; persisted together with the batch that reached it """
+        self._committed_rows += rows
+        self._duplicate_rows += duplicates
+        if self.task:
+            self.task.checkpoint_offset = offset
+            self.task.row_count = (self.task.row_count or 0) + rows
+            self.task.duplicate_count = (self.task.duplicate_count or 0) + duplicates
+
+    def row_counts(self):
+        """
+        Rows committed and duplicates skipped across every parse task of the import, including runs before a resume
+        :return: (imported, duplicates)
+        """
+        if not self.task:
+            return self._committed_rows, self._duplicate_rows
+        parse_tasks = self.import_request.tasks.filter_by(name=self.task.name).all()
+        return sum(task.row_count or 0 for task in parse_tasks), sum(task.duplicate_count or 0 for task in parse_tasks)
+
+    def _on_running(self):
+        if self.import_request.status != CandidateImportStatus.ERROR:
+            self.import_request.status = CandidateImportStatus.RUNNING
+
+    def _on_finished(self):
+        if self.final:
+            self.import_request.status = CandidateImportStatus.FINISHED
+
+    def _on_error(self):
+        self.import_request.status = CandidateImportStatus.ERROR
+
+
+class MailerFileProgress(TaskProgress):
+    """ Task progress of a mailer file export, counting the rows written so far """
+    task_model = MailerTask
+
+    def checkpoint(self, rows):
+        if self.task:
+            self.task.row_count = rows
@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+import inflect
+
+_engine = inflect.engine()
+
+
+@lru_cache(maxsize=65536)
+def spell_amount(amount):
+    """
+    Spells a whole dollar amount for mailer checks, e.g. 'Five Thousand Dollars and No Cents'
+    Amounts cluster heavily across a mailing list so inflect is only consulted once per distinct value
+    """
+    return '{} {}'.format(_engine.number_to_words(amount).title(), 'Dollars and No Cents')
@@ -0,0 +1,62 @@
+import hashlib
+import re
+from operator import itemgetter
+
+# candidate record field -> vendor file column
+CANDIDATE_COLUMNS = (
+    ('suffix', 'SUFFIX'),
+    ('first_name', 'FNAME'),
+    ('last_name', 'LNAME'),
+    ('middle_initial', 'MI'),
+    ('address', 'ADDRESS'),
+    ('city', 'CITY'),
+    ('state', 'STATE'),
+    ('zip', 'ZIP'),
+    ('zip4', 'ZIP4'),
+    ('estimated_debt', 'EST RVLV'),
+)
+
+_NON_ALPHANUMERIC = re.compile(r'[^A-Z0-9]+')
+
+
+class MissingColumnsError(ValueError):
+    def __init__(self, missing):
+        super().__init__(f'Candidate file is missing required columns: {", ".join(missing)}')
+        self.missing = missing
+
+
+def compile_header(fields, columns=CANDIDATE_COLUMNS):
+    """
+    Resolves a vendor header row into a projector that maps a CSV row to a candidate record
+    :return: function(row) -> dict
+    """
+    keys = [key.strip().upper() for key in fields]
+    missing = [column for _, column in columns if column not in keys]
+    if missing:
+        raise MissingColumnsError(missing)
+
+    names = tuple(name for name, _ in columns)
+    getter = itemgetter(*(keys.index(column) for _, column in columns))
+
+    def project(row):
+        return dict(zip(names, getter(row)))
+
+    return project
+
+
+def candidate_fingerprint(first_name, last_name, address, zip_code, suffix=None):
+    """
+    Identifies a candidate across vendor files by normalized name, suffix, street address and 5 digit zip
+    The suffix only takes part when present, so candidates without one keep the fingerprint they were stored with
+    :return: 40 character hex digest
+    """
+    zip5 = (zip_code or '').strip().zfill(5)[:5]
+    parts = (_normalize(first_name), _normalize(last_name), _normalize(address), zip5)
+    suffix = _normalize(suffix)
+    if suffix:
+        parts += (suffix,)
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _normalize(value):
+    return _NON_ALPHANUMERIC.sub(' ', (value or '').upper()).strip()
@@ -0,0 +1,69 @@
+import os
+
+
+class ByteCountingLineReader(object):
+    """
+    Yields decoded lines from a binary stream, tracking how many bytes have been consumed
+    Lines which are not valid in the encoding are yielded with replacement characters and flagged in decode_error
+    """
+
+    def __init__(self, stream, total_size=None, encoding='utf-8', limit=None):
+        self.stream = stream
+        self.encoding = encoding
+        self.limit = limit
+        self.bytes_read = 0
+        self.decode_error = None
+        self.total_size = total_size if total_size is not None else _stream_size(stream)
+
+    def __iter__(self):
+        if self.limit is not None and self.limit <= 0:
+            return
+        for line in self.stream:
+            self.bytes_read += len(line)
+            yield self._decode(line)
+            if self.limit is not None and self.bytes_read >= self.limit:
+                break
+
+    def pop_decode_error(self):
+        """ :return: why a line read since the last call could not be decoded, or None """
+        error, self.decode_error = self.decode_error, None
+        return error
+
+    def _decode(self, line):
+        try:
+            return line.decode(self.encoding)
+        except UnicodeDecodeError as e:
+            self.decode_error = f'Invalid {self.encoding} byte {line[e.start:e.start + 1]!r} at column {e.start + 1}'
+            return line.decode(self.encoding, errors='replace')
+
+    @property
+    def progress(self):
+        if not self.total_size:
+            return 0
+        return min(self.bytes_read / self.total_size, 1) * 100
+
+
+def _stream_size(stream):
+    try:
+        return os.fstat(stream.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def line_aligned_ranges(file_path, chunk_size):
+    """
+    Splits a CSV file into (start, end) byte ranges of roughly chunk_size, excluding the header line
+    Each range begins and ends on a line boundary so it can be parsed independently
+    """
+    size = os.path.getsize(file_path)
+    ranges = []
+    with open(file_path, 'rb') as stream:
+        stream.readline()
+        start = stream.tell()
+        while start < size:
+            stream.seek(min(start + chunk_size, size))
+            stream.readline()
+            end = stream.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
@@ -15,6 +15,14 @@ class FileToFilenameField(fields.String):
 
 class CampaignDto(object):
     api = Namespace('campaign', description='campaign related operations')
+    tasks = api.model('mailer_task', {
+        'name': fields.String(),
+        'description': fields.String(),
+        'message': fields.String(),
+        'complete': fields.Boolean(),
+        'progress': fields.Integer(),
+        'row_count': fields.Integer()
+    })
     campaign = api.model('campaign', {
         'public_id': fields.String(required=True),
         'name': fields.String(required=True),
@@ -24,8 +32,14 @@ class CampaignDto(object):
         'offer_expire_date': fields.String(required=True),
         'mailing_date': fields.String(required=True),
         'mailer_file': FileToFilenameField(required=False),
+        'mailer_delta_file': FileToFilenameField(required=False),
+        'candidate_count': fields.Integer(),
         'inserted_on': fields.DateTime()
     })
+    campaign_tasks = api.model('campaign_tasks', {
+        'public_id': fields.String(required=True),
+        'tasks': fields.List(fields.Nested(tasks))
+    })
     new_campaign = api.model('new_campaign', {
         'name': fields.String(required=True),
         'description': fields.String(required=False),
@@ -209,16 +223,27 @@ class CandidateDto:
         'description': fields.String(),
         'message': fields.String(),
         'complete': fields.Boolean(),
-        'progress': fields.Integer()
+        'progress': fields.Integer(),
+        'row_count': fields.Integer()
     })
     imports = api.model('candidate_import_request', {
         'public_id': fields.String(required=True),
         'file': FileToFilenameField(required=True),
         'status': CandidateImportStatusField(required=True),
+        'imported_count': fields.Integer(),
+        'rejected_count': fields.Integer(),
+        'duplicate_count': fields.Integer(),
         'inserted_on': fields.DateTime(required=True),
         'updated_on': fields.DateTime(required=True),
         'tasks': fields.List(fields.Nested(tasks))
     })
+    import_rejects = api.model('candidate_import_reject', {
+        'line_number': fields.Integer(),
+        'offset': fields.Integer(),
+        'reason': fields.String(),
+        'row': fields.String(),
+        'inserted_on': fields.DateTime()
+    })
     candidate_upload = parsers.file_upload
     new_credit_report_account = api.model('candidate_create_request', {
         'email': fields.String(required=True, example='charlie.test-pjndl@gmail.com'),
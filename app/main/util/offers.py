@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def _round(values):
+    # numpy rounds half to even, matching python's built-in round()
+    return np.rint(values).astype(np.int64)
+
+
+def compute_offers(estimated_debts):
+    """
+    Computes the mailer offer columns for a batch of estimated debts
+    :param estimated_debts: sequence, array.array or numpy array of integer debts
+    :return: dict of column name -> list of python values, in input order
+    """
+    debt = np.asarray(estimated_debts, dtype=np.int64)
+
+    debt3 = _round(0.03 * debt)
+    debt15 = _round((debt + (debt * 0.06)) / 60)
+    debt2 = debt - 5000
+    debt215 = _round((debt2 + (debt2 * 0.06)) / 60)
+    debt3_2 = debt + 5000
+    checkamt = debt + 5000
+    debt315 = _round((debt3_2 + (debt3_2 * 0.06)) / 60)
+    year_interest = _round(debt * 0.1899)
+    total_interest = year_interest * 22
+    sav215 = _round((((debt2 * 0.03) - debt215) * 12) - 4)
+    sav15 = (debt3 * 12) - (debt15 * 12)
+    sav315 = (((debt3_2 * 0.03) - debt315) * 12) + 4
+
+    columns = dict(debt3=debt3, debt15=debt15, debt2=debt2, debt215=debt215, debt3_2=debt3_2, checkamt=checkamt,
+                   debt315=debt315, year_interest=year_interest, total_interest=total_interest, sav215=sav215,
+                   sav15=sav15, sav315=sav315)
+    # tolist() hands back native ints/floats which db drivers can adapt
+    return {column: values.tolist() for column, values in columns.items()}
@@ -1,5 +1,5 @@
 import werkzeug
-from flask_restplus import reqparse
+from flask_restplus import inputs, reqparse
 
 file_upload = reqparse.RequestParser()
 file_upload.add_argument('csv_file',
@@ -7,3 +7,19 @@ file_upload.add_argument('csv_file',
                          location='files',
                          required=True,
                          help='CSV file')
+
+mailer_file_options = reqparse.RequestParser()
+mailer_file_options.add_argument('incremental',
+                                 type=inputs.boolean,
+                                 location='args',
+                                 default=False,
+                                 help='Append only candidates added since the last export')
+mailer_file_options.add_argument('delta',
+                                 type=inputs.boolean,
+                                 location='args',
+                                 default=False,
+                                 help='Also write the appended candidates to a separate delta file')
+mailer_file_options.add_argument('compress',
+                                 type=inputs.boolean,
+                                 location='args',
+                                 help='Gzip the mailer file; defaults to the format of the existing file')
@@ -0,0 +1,83 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+class PoolSaturatedError(RuntimeError):
+    pass
+
+
+class BoundedExecutor(object):
+    """
+    Thread pool which runs at most max_workers jobs at once and lets at most max_queued more wait for a thread
+    Callers block until their job is done; once the queue is full they are turned away instead of piling up
+    """
+
+    def __init__(self, max_workers, max_queued, name='pool'):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._rejected = 0
+
+    @property
+    def queue_depth(self):
+        """ Jobs submitted but still waiting for a free worker thread """
+        return max(self._in_flight - self.max_workers, 0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'in_flight': self._in_flight,
+                'queue_depth': self.queue_depth,
+                'max_queued': self.max_queued,
+                'peak_queue_depth': self._peak_queued,
+                'rejected': self._rejected
+            }
+
+    def call(self, fn, *args, wait=None):
+        """
+        Runs fn(*args) on the pool and returns its result
+        :param wait: seconds to wait for room in the queue before raising PoolSaturatedError; None waits forever
+        """
+        if not self._slots.acquire(timeout=wait):
+            with self._lock:
+                self._rejected += 1
+            raise PoolSaturatedError(f'{self.max_workers + self.max_queued} jobs already in flight')
+
+        with self._lock:
+            self._in_flight += 1
+            self._peak_queued = max(self._peak_queued, self.queue_depth)
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def password_pool():
+    """ Per-process pool for bcrypt hashing, created on first use so each forked web worker gets its own threads """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = BoundedExecutor(current_app.config['PASSWORD_HASH_WORKERS'],
+                                    current_app.config['PASSWORD_HASH_QUEUE_SIZE'], name='bcrypt')
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def run_password_hashing(fn, *args):
+    """ bcrypt releases the GIL, so hashing on the pool runs on other cores while request threads keep serving """
+    return password_pool().call(fn, *args, wait=current_app.config['PASSWORD_HASH_WAIT'])
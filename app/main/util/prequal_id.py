@@ -0,0 +1,30 @@
+# every letter holds the numbers 10001..99999: A10001 is the first prequal id and B10001 follows A99999
+FIRST_NUMBER = 10001
+IDS_PER_LETTER = 100000 - FIRST_NUMBER
+LETTERS = 26
+
+
+def format_prequal_id(ordinal):
+    """
+    Renders the n-th prequal id of the sequence, counting from 1
+    :return: letter followed by a 5 digit number, e.g. 1 -> A10001, 90000 -> B10001
+    :raises ValueError: when the ordinal is past the last id, Z99999
+    """
+    if ordinal < 1:
+        raise ValueError(f'Prequal id ordinal must be positive, got {ordinal}')
+    letter, number = divmod(ordinal - 1, IDS_PER_LETTER)
+    if letter >= LETTERS:
+        raise ValueError(f'Prequal ids are exhausted, ordinal {ordinal} is past Z99999')
+    return f'{chr(ord("A") + letter)}{FIRST_NUMBER + number}'
+
+
+def parse_prequal_id(prequal_id):
+    """
+    Inverse of format_prequal_id; the seed value A10000 maps to 0 (nothing issued yet)
+    :return: ordinal of the prequal id within the sequence
+    """
+    prequal_id = prequal_id.strip()
+    letter, number = prequal_id[:1].upper(), int(prequal_id[1:])
+    if not 'A' <= letter <= 'Z' or not FIRST_NUMBER - 1 <= number < FIRST_NUMBER + IDS_PER_LETTER:
+        raise ValueError(f'Invalid prequal id: {prequal_id}')
+    return (ord(letter) - ord('A')) * IDS_PER_LETTER + number - FIRST_NUMBER + 1
@@ -1,5 +1,11 @@
-import unittest
+import datetime
 import json
+import unittest
+import uuid
+
+from app.main import db, flask_bcrypt
+from app.main.model.user import User
+from app.main.service.auth_helper import Auth
 from app.test.base import BaseTestCase
 
 
@@ -77,5 +83,34 @@ class TestAuthBlueprint(BaseTestCase):
             self.assertTrue(data['status'] == 'success')
             self.assertEqual(response.status_code, 200)
 
+    def test_login_rehashes_password_at_configured_cost(self):
+        """ Test that logging in upgrades a password hashed at a different cost """
+        rounds = self.app.config['BCRYPT_PASSWORD_ROUNDS']
+        user = User(
+            first_name='Test',
+            last_name='User',
+            email='example@gmail.com',
+            registered_on=datetime.datetime.utcnow(),
+            require_2fa=False,
+            language='en',
+            personal_phone='555-555-5555',
+            public_id=str(uuid.uuid4()),
+            username='username',
+            password_hash=flask_bcrypt.generate_password_hash('123456', rounds + 1).decode('utf-8')
+        )
+        db.session.add(user)
+        db.session.commit()
+        self.assertTrue(user.password_needs_rehash())
+
+        response, status = Auth.login_user(dict(username='username', password='123456'))
+        self.assertEqual(status, 200)
+        self.assertEqual(response['status'], 'success')
+
+        user = User.query.filter_by(username='username').first()
+        self.assertEqual(user.password_hash.split('$')[2], '%02d' % rounds)
+        self.assertFalse(user.password_needs_rehash())
+        self.assertTrue(user.check_password('123456'))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
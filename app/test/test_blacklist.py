@@ -0,0 +1,143 @@
+import datetime
+import unittest
+import uuid
+
+import jwt
+from redis.exceptions import RedisError
+
+from app.main import db
+from app.main.model import blacklist
+from app.main.model.blacklist import BlacklistToken, CACHE_LOADED_KEY, token_digest
+from app.main.service.blacklist_service import save_token
+from app.test.base import BaseTestCase
+
+
+def make_token(expires_in=datetime.timedelta(days=1)):
+    claims = {'exp': datetime.datetime.utcnow() + expires_in, 'sub': 1, 'jti': str(uuid.uuid4())}
+    token = jwt.encode(claims, 'secret', algorithm='HS256')
+    return token.decode('utf-8') if isinstance(token, bytes) else token
+
+
+class MemoryRedis(object):
+    """ Just enough of a redis connection for the token blacklist, ignoring expiry """
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def pipeline(self, transaction=True):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline(object):
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.commands = []
+
+    def exists(self, key):
+        self.commands.append(lambda: self.connection.exists(key))
+        return self
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+class UnavailableRedis(object):
+
+    def __getattr__(self, name):
+        raise RedisError('Connection refused')
+
+
+class TestBlacklistToken(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.redis = self.app.redis
+        self.app.redis = MemoryRedis()
+        blacklist._verified_tokens.clear()
+
+    def tearDown(self):
+        self.app.redis = self.redis
+        blacklist._verified_tokens.clear()
+        super().tearDown()
+
+    def test_logged_out_token_is_rejected_from_cache(self):
+        BlacklistToken.warm_cache()
+        token = make_token()
+
+        response, status = save_token(token)
+
+        self.assertEqual(response['status'], 'success')
+        self.assertIn(blacklist._cache_key(token_digest(token)), self.app.redis.values)
+        # the cached digest alone is enough once the cache is loaded
+        BlacklistToken.query.delete()
+        db.session.commit()
+        self.assertTrue(BlacklistToken.check_blacklist(token))
+        self.assertFalse(BlacklistToken.check_blacklist(make_token(datetime.timedelta(hours=1))))
+
+    def test_falls_back_to_database_when_redis_fails(self):
+        token = make_token()
+        save_token(token)
+        self.app.redis = UnavailableRedis()
+
+        self.assertTrue(BlacklistToken.check_blacklist(token))
+        self.assertFalse(BlacklistToken.check_blacklist(make_token(datetime.timedelta(hours=1))))
+
+    def test_falls_back_to_database_until_cache_is_loaded(self):
+        token = make_token()
+        db.session.add(BlacklistToken(token=token))
+        db.session.commit()
+
+        self.assertNotIn(CACHE_LOADED_KEY, self.app.redis.values)
+        self.assertTrue(BlacklistToken.check_blacklist(token))
+
+        self.assertEqual(BlacklistToken.warm_cache(), 1)
+        self.assertIn(CACHE_LOADED_KEY, self.app.redis.values)
+        self.assertTrue(BlacklistToken.check_blacklist(token))
+
+    def test_logout_fails_when_token_cannot_be_cached(self):
+        self.app.redis = UnavailableRedis()
+
+        response, status = save_token(make_token())
+
+        self.assertEqual(response['status'], 'fail')
+        self.assertEqual(BlacklistToken.query.count(), 0)
+
+    def test_revoking_evicts_verified_token(self):
+        BlacklistToken.warm_cache()
+        token = make_token()
+        self.assertFalse(BlacklistToken.check_blacklist(token))
+        self.assertIn(token, blacklist._verified_tokens)
+
+        save_token(token)
+
+        self.assertNotIn(token, blacklist._verified_tokens)
+        self.assertTrue(BlacklistToken.check_blacklist(token))
+
+    def test_purge_expired_deletes_only_expired_tokens(self):
+        now = datetime.datetime.utcnow()
+        expired, unexpired, no_expiry = (BlacklistToken(token=make_token()) for _ in range(3))
+        expired.expires_on = now - datetime.timedelta(minutes=1)
+        unexpired.expires_on = now + datetime.timedelta(minutes=1)
+        no_expiry.expires_on = None
+        db.session.add_all([expired, unexpired, no_expiry])
+        db.session.commit()
+        kept = {unexpired.token_digest, no_expiry.token_digest}
+
+        self.assertEqual(BlacklistToken.purge_expired(), 1)
+        self.assertEqual({token.token_digest for token in BlacklistToken.query}, kept)
+
+    def test_token_expiry_is_read_from_exp_claim(self):
+        token = BlacklistToken(token=make_token(datetime.timedelta(hours=2)))
+        self.assertAlmostEqual((token.expires_on - datetime.datetime.utcnow()).total_seconds(), 7200, delta=5)
+        self.assertIsNone(BlacklistToken(token='not a jwt').expires_on)
+
+
+if __name__ == '__main__':
+    unittest.main()
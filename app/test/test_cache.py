@@ -0,0 +1,55 @@
+import unittest
+
+from app.main.util.cache import TTLCache
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.cache = TTLCache(maxsize=2, ttl=10, timer=self.timer)
+
+    def test_entries_expire(self):
+        self.cache.set('a', 1)
+        self.timer.now = 9.9
+        self.assertEqual(self.cache.get('a'), 1)
+        self.timer.now = 10
+        self.assertIsNone(self.cache.get('a'))
+        self.assertNotIn('a', self.cache)
+
+    def test_entry_ttl_overrides_default(self):
+        self.cache.set('a', 1, ttl=1)
+        self.timer.now = 1
+        self.assertNotIn('a', self.cache)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+
+    def test_pop_removes_entry(self):
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.pop('a'), 1)
+        self.assertIsNone(self.cache.pop('a'))
+
+    def test_zero_ttl_disables_cache(self):
+        cache = TTLCache(ttl=0, timer=self.timer)
+        cache.set('a', 1)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from app.main.util.candidate_csv import compile_header, MissingColumnsError, candidate_fingerprint
+
+HEADER = ['Suffix', 'FName', 'MI', 'LName', 'Address', 'City', 'State', 'Zip', 'Zip4', 'Est Rvlv', 'Extra']
+
+
+class TestCompileHeader(unittest.TestCase):
+
+    def test_projects_row_to_record(self):
+        project = compile_header(HEADER)
+        record = project(['JR', 'John', 'Q', 'Smith', '1 Main St', 'Boston', 'MA', '2101', '1234', '12,000', 'x'])
+
+        self.assertEqual(record['first_name'], 'John')
+        self.assertEqual(record['last_name'], 'Smith')
+        self.assertEqual(record['middle_initial'], 'Q')
+        self.assertEqual(record['zip'], '2101')
+        self.assertEqual(record['estimated_debt'], '12,000')
+        self.assertNotIn('Extra', record)
+
+    def test_missing_columns_are_reported(self):
+        with self.assertRaises(MissingColumnsError) as context:
+            compile_header(['FNAME', 'LNAME'])
+
+        self.assertIn('EST RVLV', context.exception.missing)
+        self.assertNotIn('FNAME', context.exception.missing)
+
+
+class TestCandidateFingerprint(unittest.TestCase):
+
+    def test_ignores_case_punctuation_and_zip_padding(self):
+        self.assertEqual(candidate_fingerprint('John', 'Smith', '1 Main St.', '2101'),
+                         candidate_fingerprint('JOHN ', 'smith', '1  MAIN ST', '02101'))
+
+    def test_distinguishes_candidates(self):
+        self.assertNotEqual(candidate_fingerprint('John', 'Smith', '1 Main St', '02101'),
+                            candidate_fingerprint('Jane', 'Smith', '1 Main St', '02101'))
+
+    def test_distinguishes_suffixes(self):
+        self.assertNotEqual(candidate_fingerprint('John', 'Smith', '1 Main St', '02101', 'Jr'),
+                            candidate_fingerprint('John', 'Smith', '1 Main St', '02101', 'Sr'))
+        self.assertEqual(candidate_fingerprint('John', 'Smith', '1 Main St', '02101', 'Jr.'),
+                         candidate_fingerprint('John', 'Smith', '1 Main St', '02101', 'JR'))
+
+    def test_missing_suffix_keeps_fingerprint(self):
+        fingerprint = candidate_fingerprint('John', 'Smith', '1 Main St', '02101')
+        self.assertEqual(candidate_fingerprint('John', 'Smith', '1 Main St', '02101', ''), fingerprint)
+        self.assertEqual(candidate_fingerprint('John', 'Smith', '1 Main St', '02101', None), fingerprint)
+        self.assertNotEqual(candidate_fingerprint('John', 'Smith', '1 Main St', '02101', 'Jr'), fingerprint)
+
+
+if __name__ == '__main__':
+    unittest.main()
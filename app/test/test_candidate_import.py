@@ -0,0 +1,183 @@
+import datetime
+import io
+import unittest
+import uuid
+
+from app.main import db
+from app.main.model.candidate import Candidate, CandidateImport, CandidateImportReject, CandidateImportStatus
+from app.main.model.task import ImportTask
+from app.main.tasks import import_candidate_stream, finalize_candidate_import
+from app.main.tasks.candidate_batch import MAX_ESTIMATED_DEBT
+from app.main.tasks.progress import CandidateImportProgress
+from app.test.base import BaseTestCase
+
+HEADER = b'SUFFIX,FNAME,MI,LNAME,ADDRESS,CITY,STATE,ZIP,ZIP4,EST RVLV\n'
+
+
+def candidate_line(i, debt='"12,000"'):
+    return f',John,Q,Smith{i},{i} Main St,Boston,MA,02101,1234,{debt}\n'.encode('utf-8')
+
+
+class TestImportCandidateStream(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.batch_size = self.app.config.get('CANDIDATE_IMPORT_BATCH_SIZE')
+        self.app.config['CANDIDATE_IMPORT_BATCH_SIZE'] = 2
+
+        now = datetime.datetime.utcnow()
+        self.import_request = CandidateImport(public_id=str(uuid.uuid4()), file='candidates.csv',
+                                              inserted_on=now, updated_on=now)
+        db.session.add(self.import_request)
+        db.session.commit()
+
+    def tearDown(self):
+        self.app.config['CANDIDATE_IMPORT_BATCH_SIZE'] = self.batch_size
+        super().tearDown()
+
+    def _add_task(self, **fields):
+        task = ImportTask(id=str(uuid.uuid4()), name='parse_candidate_file', description='Parse candidate file',
+                          candidate_import=self.import_request, **fields)
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    def _progress(self, task=None, final=True):
+        progress = CandidateImportProgress(self.import_request, final=final)
+        progress._task = task  # outside of a worker there is no rq job to look the task up by
+        return progress
+
+    def test_checkpoints_file_offset_and_row_count(self):
+        data = HEADER + b''.join(candidate_line(i) for i in range(5))
+        task = self._add_task()
+
+        imported = import_candidate_stream(self.import_request, io.BytesIO(data), self._progress(task))
+
+        self.assertEqual(imported, 5)
+        self.assertEqual(task.checkpoint_offset, len(data))
+        self.assertEqual(task.row_count, 5)
+        self.assertTrue(task.complete)
+        self.assertEqual(self.import_request.imported_count, 5)
+        self.assertEqual(self.import_request.status, CandidateImportStatus.FINISHED)
+        self.assertEqual(Candidate.query.filter_by(import_id=self.import_request.id).count(), 5)
+
+    def test_continues_from_checkpoint_without_duplicates(self):
+        lines = [candidate_line(i) for i in range(6)]
+        data = HEADER + b''.join(lines)
+        checkpoint = len(HEADER) + sum(len(line) for line in lines[:3])
+        stream = io.BytesIO(data)
+
+        # first run commits three rows before its worker dies
+        first = self._add_task(start_offset=len(HEADER), end_offset=len(data))
+        stream.seek(len(HEADER))
+        import_candidate_stream(self.import_request, stream, self._progress(first, final=False),
+                                total_size=checkpoint - len(HEADER), header=HEADER, offset=len(HEADER))
+        self.assertEqual(first.checkpoint_offset, checkpoint)
+
+        # the resumed run starts from the checkpoint and carries the committed counts over
+        resumed = self._add_task(start_offset=len(HEADER), end_offset=len(data), checkpoint_offset=checkpoint,
+                                 row_count=first.row_count)
+        db.session.delete(first)
+        db.session.commit()
+        stream.seek(checkpoint)
+        imported = import_candidate_stream(self.import_request, stream, self._progress(resumed),
+                                           total_size=len(data) - checkpoint, header=HEADER, offset=checkpoint)
+
+        self.assertEqual(imported, 3)
+        self.assertEqual(resumed.checkpoint_offset, len(data))
+        self.assertEqual(self.import_request.imported_count, 6)
+        self.assertEqual(self.import_request.duplicate_count, 0)
+        self.assertEqual(Candidate.query.filter_by(import_id=self.import_request.id).count(), 6)
+
+    def test_rereading_committed_rows_skips_them_as_duplicates(self):
+        data = HEADER + b''.join(candidate_line(i) for i in range(3))
+        import_candidate_stream(self.import_request, io.BytesIO(data), self._progress())
+
+        imported = import_candidate_stream(self.import_request, io.BytesIO(data), self._progress())
+
+        self.assertEqual(imported, 0)
+        self.assertEqual(self.import_request.duplicate_count, 3)
+        self.assertEqual(Candidate.query.filter_by(import_id=self.import_request.id).count(), 3)
+
+    def test_malformed_and_oversized_rows_are_rejected(self):
+        lines = [
+            candidate_line(0),
+            b',John,Q,Smith1\n',
+            b',John,Q,' + b'S' * 26 + b',2 Main St,Boston,MA,02101,1234,100\n',
+            b',J\xe9r\xf4me,Q,Smith3,3 Main St,Boston,MA,02101,1234,100\n',
+            candidate_line(4, debt=str(MAX_ESTIMATED_DEBT + 1)),
+            candidate_line(5, debt='-1'),
+            candidate_line(6),
+        ]
+        data = HEADER + b''.join(lines)
+
+        imported = import_candidate_stream(self.import_request, io.BytesIO(data), self._progress())
+
+        self.assertEqual(imported, 2)
+        self.assertEqual(self.import_request.status, CandidateImportStatus.FINISHED)
+        self.assertEqual(self.import_request.rejected_count, 5)
+        rejects = {reject.offset: reject for reject in self.import_request.rejects}
+        offsets = [len(HEADER) + sum(len(line) for line in lines[:i]) for i in range(len(lines))]
+        self.assertEqual(sorted(rejects), offsets[1:6])
+        self.assertIn('Expected 10 columns', rejects[offsets[1]].reason)
+        self.assertIn('last_name exceeds 25 characters', rejects[offsets[2]].reason)
+        self.assertIn('Invalid utf-8 byte', rejects[offsets[3]].reason)
+        self.assertIn('estimated_debt', rejects[offsets[4]].reason)
+        self.assertIn('estimated_debt', rejects[offsets[5]].reason)
+        self.assertEqual(rejects[offsets[1]].line_number, 3)
+
+    def test_blank_lines_are_skipped(self):
+        data = HEADER + candidate_line(0) + b'\n\r\n' + candidate_line(1)
+
+        imported = import_candidate_stream(self.import_request, io.BytesIO(data), self._progress())
+
+        self.assertEqual(imported, 2)
+        self.assertEqual(CandidateImportReject.query.count(), 0)
+
+    def test_empty_file_fails_the_import(self):
+        imported = import_candidate_stream(self.import_request, io.BytesIO(b''), self._progress())
+
+        self.assertIsNone(imported)
+        self.assertEqual(self.import_request.status, CandidateImportStatus.ERROR)
+
+
+class TestFinalizeCandidateImport(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = datetime.datetime.utcnow()
+        self.import_request = CandidateImport(public_id=str(uuid.uuid4()), file='candidates.csv',
+                                              inserted_on=now, updated_on=now)
+        db.session.add(self.import_request)
+        db.session.commit()
+
+    def _add_chunk(self, row_count, duplicate_count=0, complete=True, message=None):
+        db.session.add(ImportTask(id=str(uuid.uuid4()), name='parse_candidate_file', description='Parse chunk',
+                                  candidate_import=self.import_request, row_count=row_count,
+                                  duplicate_count=duplicate_count, complete=complete, message=message))
+        db.session.commit()
+
+    def test_sums_chunk_totals(self):
+        self._add_chunk(10, 1)
+        self._add_chunk(7, 2)
+        self._add_chunk(3)
+
+        imported = finalize_candidate_import(self.import_request.id)
+
+        self.assertEqual(imported, 20)
+        self.assertEqual(self.import_request.imported_count, 20)
+        self.assertEqual(self.import_request.duplicate_count, 3)
+        self.assertEqual(self.import_request.status, CandidateImportStatus.FINISHED)
+
+    def test_fails_when_a_chunk_failed(self):
+        self._add_chunk(10)
+        self._add_chunk(0, message='database is locked')
+        self._add_chunk(0, complete=False)
+
+        self.assertIsNone(finalize_candidate_import(self.import_request.id))
+        self.assertEqual(self.import_request.status, CandidateImportStatus.ERROR)
+        self.assertEqual(self.import_request.imported_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
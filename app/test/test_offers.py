@@ -0,0 +1,49 @@
+import array
+import unittest
+
+from app.main.util.offers import compute_offers
+
+
+def scalar_offer(estimated_debt):
+    """ Reference implementation: the per-row formulas previously used by parse_candidate_file """
+    debt3 = round(0.03 * estimated_debt)
+    debt15 = round((estimated_debt + (estimated_debt * 0.06)) / 60)
+    debt2 = estimated_debt - 5000
+    debt215 = round((debt2 + (debt2 * 0.06)) / 60)
+    debt3_2 = estimated_debt + 5000
+    checkamt = estimated_debt + 5000
+    debt315 = round((debt3_2 + (debt3_2 * 0.06)) / 60)
+    year_interest = round(estimated_debt * 0.1899)
+    total_interest = year_interest * 22
+    sav215 = round((((debt2 * 0.03) - debt215) * 12) - 4)
+    sav15 = (debt3 * 12) - (debt15 * 12)
+    sav315 = (((debt3_2 * 0.03) - debt315) * 12) + 4
+    return dict(debt3=debt3, debt15=debt15, debt2=debt2, debt215=debt215, debt3_2=debt3_2, checkamt=checkamt,
+                debt315=debt315, year_interest=year_interest, total_interest=total_interest, sav215=sav215,
+                sav15=sav15, sav315=sav315)
+
+
+class TestComputeOffers(unittest.TestCase):
+
+    def assertMatchesScalar(self, debts):
+        offers = compute_offers(debts)
+        for i, debt in enumerate(debts):
+            expected = scalar_offer(debt)
+            for column, value in expected.items():
+                self.assertEqual(offers[column][i], value, f'{column} differs for estimated_debt={debt}')
+                self.assertIs(type(offers[column][i]), type(value), f'{column} type differs for {debt}')
+
+    def test_matches_scalar_formulas(self):
+        self.assertMatchesScalar(list(range(-10000, 250000, 37)))
+
+    def test_matches_scalar_rounding_on_halves(self):
+        # 0.03 * 50 == 1.5 and 0.03 * 150 == 4.5 exercise round-half-to-even
+        self.assertMatchesScalar([0, 50, 150, 250, 1000, 5000, 4999, 5001])
+
+    def test_accepts_array_input(self):
+        debts = array.array('l', [0, 12000, 35250])
+        self.assertEqual(compute_offers(debts)['checkamt'], [5000, 17000, 40250])
+
+
+if __name__ == '__main__':
+    unittest.main()
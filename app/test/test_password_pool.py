@@ -0,0 +1,45 @@
+import threading
+import time
+import unittest
+
+from app.main.util.password_pool import BoundedExecutor, PoolSaturatedError
+
+
+class TestBoundedExecutor(unittest.TestCase):
+
+    def test_returns_result(self):
+        pool = BoundedExecutor(max_workers=2, max_queued=2)
+        self.assertEqual(pool.call(pow, 2, 10), 1024)
+        self.assertEqual(pool.stats()['in_flight'], 0)
+
+    def test_counts_queue_depth_and_rejects_when_full(self):
+        pool = BoundedExecutor(max_workers=1, max_queued=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        callers = [threading.Thread(target=pool.call, args=(block,)) for _ in range(2)]
+        callers[0].start()
+        started.wait(5)
+        callers[1].start()
+        while pool.stats()['in_flight'] < 2:
+            time.sleep(0.001)
+
+        self.assertEqual(pool.queue_depth, 1)
+        with self.assertRaises(PoolSaturatedError):
+            pool.call(block, wait=0.01)
+
+        release.set()
+        for caller in callers:
+            caller.join(5)
+        stats = pool.stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['peak_queue_depth'], 1)
+        self.assertEqual(stats['rejected'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from app.main.service.prequal_id_service import PrequalIdAllocator, SEQUENCE_KEY
+from app.main.util.prequal_id import format_prequal_id, parse_prequal_id
+
+
+class TestPrequalId(unittest.TestCase):
+
+    def test_sequence_starts_after_seed(self):
+        self.assertEqual(parse_prequal_id('A10000'), 0)
+        self.assertEqual(format_prequal_id(1), 'A10001')
+
+    def test_rolls_over_to_next_letter(self):
+        self.assertEqual(format_prequal_id(89999), 'A99999')
+        self.assertEqual(format_prequal_id(90000), 'B10001')
+
+    def test_round_trip(self):
+        for ordinal in (1, 2, 89998, 89999, 90000, 123456, 26 * 89999):
+            self.assertEqual(parse_prequal_id(format_prequal_id(ordinal)), ordinal)
+
+    def test_rejects_malformed_ids(self):
+        for value in ('A9999', 'A100000', '110001', 'AXXXXX'):
+            with self.assertRaises(ValueError):
+                parse_prequal_id(value)
+        with self.assertRaises(ValueError):
+            format_prequal_id(0)
+
+    def test_sequence_ends_at_z(self):
+        self.assertEqual(format_prequal_id(26 * 89999), 'Z99999')
+        with self.assertRaises(ValueError):
+            format_prequal_id(26 * 89999 + 1)
+
+
+class CounterConnection(object):
+    """ Just enough of a redis connection for the allocator, with the sequence already seeded """
+
+    def __init__(self):
+        self.values = {SEQUENCE_KEY: 0}
+
+    def exists(self, key):
+        return key in self.values
+
+    def setnx(self, key, value):
+        self.values.setdefault(key, value)
+
+    def incrby(self, key, amount):
+        self.values[key] += amount
+        return self.values[key]
+
+
+class TestPrequalIdAllocator(unittest.TestCase):
+
+    def test_reserves_only_the_ids_needed(self):
+        connection = CounterConnection()
+        first = PrequalIdAllocator(connection, block_size=1000, needed=3)
+        self.assertEqual([next(first) for _ in range(3)], ['A10001', 'A10002', 'A10003'])
+
+        second = PrequalIdAllocator(connection, block_size=1000, needed=2)
+        self.assertEqual([next(second) for _ in range(2)], ['A10004', 'A10005'])
+        self.assertEqual(connection.values[SEQUENCE_KEY], 5)
+
+    def test_reserves_blocks_of_at_most_block_size(self):
+        connection = CounterConnection()
+        allocator = PrequalIdAllocator(connection, block_size=2, needed=3)
+        self.assertEqual([next(allocator) for _ in range(3)], ['A10001', 'A10002', 'A10003'])
+        self.assertEqual(connection.values[SEQUENCE_KEY], 3)
+
+    def test_keeps_allocating_past_the_estimate(self):
+        connection = CounterConnection()
+        allocator = PrequalIdAllocator(connection, block_size=1000, needed=1)
+        self.assertEqual([next(allocator) for _ in range(2)], ['A10001', 'A10002'])
+        self.assertEqual(connection.values[SEQUENCE_KEY], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
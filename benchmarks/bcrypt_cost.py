@@ -0,0 +1,37 @@
+"""
+Password verifications per second on one core at each bcrypt cost factor.
+
+    python -m benchmarks.bcrypt_cost [rounds ...]
+
+Login CPU time is dominated by the bcrypt check, so this bounds logins per second per API worker core.
+"""
+import sys
+import time
+
+import bcrypt
+
+PASSWORD = b'correct horse battery staple'
+DEFAULT_ROUNDS = (4, 8, 10, 12, 13)
+
+
+def verifications_per_second(rounds, min_seconds=2.0):
+    password_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds))
+    checks = 0
+    start = time.perf_counter()
+    while True:
+        bcrypt.checkpw(PASSWORD, password_hash)
+        checks += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return checks / elapsed
+
+
+def main(rounds=DEFAULT_ROUNDS):
+    print(f'{"rounds":>6} {"ms/check":>10} {"logins/s/core":>14}')
+    for cost in rounds:
+        rate = verifications_per_second(cost)
+        print(f'{cost:>6} {1000 / rate:>10.1f} {rate:>14.1f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROUNDS)
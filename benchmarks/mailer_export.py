@@ -0,0 +1,77 @@
+"""
+Mailer export throughput with full Candidate ORM entities versus column tuples.
+
+    python -m benchmarks.mailer_export [rows]
+
+Runs against a throwaway in-memory sqlite database seeded with synthetic candidates.
+"""
+import csv
+import datetime
+import os
+import sys
+import time
+import uuid
+
+from app import blueprint  # noqa: F401 imports every model so mappers can be configured
+from app.main import create_app, db
+from app.main.model.campaign import Campaign
+from app.main.model.candidate import Candidate
+from app.main.tasks.campaign import MAILER_MAPPING, MAILER_FILTERS, _candidate_columns, _compile_row_projector
+
+
+def seed(rows, chunk=10000):
+    campaign = Campaign(public_id=str(uuid.uuid4()), name='benchmark', phone='555-555-5555', job_number='BENCH',
+                        mailing_date='01/01/2020', offer_expire_date='02/01/2020',
+                        inserted_on=datetime.datetime.utcnow())
+    db.session.add(campaign)
+    db.session.commit()
+
+    now = datetime.datetime.utcnow()
+    for start in range(0, rows, chunk):
+        db.session.bulk_insert_mappings(Candidate, [
+            dict(public_id=str(uuid.uuid4()), inserted_on=now, campaign_id=campaign.id, first_name='John',
+                 last_name=f'Smith{i}', address=f'{i} Main St', city='Boston', state='MA', _zip='02101', zip4='1234',
+                 estimated_debt=20000, prequal_number=f'B{i}', debt3=600, debt15=353, debt2=15000, debt215=265,
+                 debt3_2=25000, checkamt=25000, spellamt='Twenty-Five Thousand Dollars and No Cents', debt315=442,
+                 year_interest=3798, total_interest=83556, sav215=-2764, sav15=2964, sav315=3700)
+            for i in range(start, min(start + chunk, rows))
+        ])
+        db.session.commit()
+    return campaign
+
+
+def export_entities(campaign, batch_size):
+    project = _compile_row_projector(MAILER_MAPPING, MAILER_FILTERS, campaign)
+    with open(os.devnull, 'w') as out:
+        writer = csv.writer(out, quoting=csv.QUOTE_ALL)
+        for candidate in campaign.candidates.order_by(Candidate.id).yield_per(batch_size):
+            writer.writerow(project(candidate))
+
+
+def export_columns(campaign, batch_size):
+    project = _compile_row_projector(MAILER_MAPPING, MAILER_FILTERS, campaign)
+    rows = campaign.candidates.with_entities(*_candidate_columns(MAILER_MAPPING)).order_by(Candidate.id)
+    with open(os.devnull, 'w') as out:
+        writer = csv.writer(out, quoting=csv.QUOTE_ALL)
+        for row in rows.yield_per(batch_size):
+            writer.writerow(project(row))
+
+
+def main(rows=500000, batch_size=1000):
+    app = create_app('test')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+
+    with app.app_context():
+        db.create_all()
+        campaign = seed(rows)
+        print(f'{rows} candidates')
+        for name, export in (('ORM entities', export_entities), ('column tuples', export_columns)):
+            start = time.perf_counter()
+            export(campaign, batch_size)
+            elapsed = time.perf_counter() - start
+            print(f'{name:>14}: {elapsed:8.2f}s, {rows / elapsed:10,.0f} rows/s')
+            db.session.expire_all()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,42 @@
+"""
+Per-row cost of building candidate spellamt values, before and after caching.
+
+    python -m benchmarks.spellamt [rows]
+"""
+import random
+import sys
+import timeit
+
+import inflect
+
+from app.main.util.amount_words import spell_amount
+
+
+def sample_check_amounts(rows, seed=42):
+    # vendor debt estimates are reported in whole hundreds and cluster below $60k
+    rnd = random.Random(seed)
+    return [int(rnd.lognormvariate(9.8, 0.6)) // 100 * 100 + 5000 for _ in range(rows)]
+
+
+def per_row_inflect(amounts):
+    p = inflect.engine()
+    return ['{} {}'.format(p.number_to_words(amount).title(), 'Dollars and No Cents') for amount in amounts]
+
+
+def per_row_cached(amounts):
+    spell_amount.cache_clear()
+    return [spell_amount(amount) for amount in amounts]
+
+
+def main(rows=100000):
+    amounts = sample_check_amounts(rows)
+    assert per_row_inflect(amounts[:1000]) == per_row_cached(amounts[:1000])
+
+    print(f'{rows} rows, {len(set(amounts))} distinct amounts')
+    for name, func in (('inflect per row', per_row_inflect), ('spell_amount', per_row_cached)):
+        elapsed = min(timeit.repeat(lambda: func(amounts), number=1, repeat=3))
+        print(f'{name:>16}: {elapsed:8.3f}s total, {elapsed / rows * 1e6:8.2f}us/row')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
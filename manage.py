@@ -7,10 +7,12 @@ from flask_script import Manager
 from app import blueprint
 from app.main import create_app, db
 from app.main.seed.admins import create_super_admin
+from app.main.service import candidate_service
 
 from app.main.background.worker import run_worker
 from app.main.model.sms import SMSMessage
 from app.main.model.campaign import Campaign
+from app.main.model.blacklist import BlacklistToken
 
 app = create_app(os.getenv('BOILERPLATE_ENV') or 'dev')
 app.register_blueprint(blueprint, url_prefix='/api/v1')
@@ -39,6 +41,27 @@ def seed():
     create_super_admin()
 
 
+@manager.command
+def backfill_candidate_fingerprints():
+    """Fingerprints existing candidates for import deduplication; rerun after fingerprint changes."""
+    updated = candidate_service.backfill_candidate_fingerprints()
+    print(f'{updated} candidates fingerprinted')
+
+
+@manager.command
+def warm_token_blacklist():
+    """Loads unexpired blacklisted tokens into redis; run on deploy, blacklist checks query the db until then."""
+    cached = BlacklistToken.warm_cache()
+    print(f'{cached} blacklisted tokens cached')
+
+
+@manager.command
+def purge_token_blacklist():
+    """Deletes expired tokens from the blacklist; meant to be scheduled, e.g. hourly from cron."""
+    purged = BlacklistToken.purge_expired()
+    print(f'{purged} expired blacklisted tokens purged')
+
+
 @manager.command
 def run():
     app.run(host='0.0.0.0')
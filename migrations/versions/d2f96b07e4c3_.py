@@ -0,0 +1,67 @@
+"""empty message
+
+Revision ID: d2f96b07e4c3
+Revises: c7a1f4e08b52
+Create Date: 2019-11-15 14:38:20.517294
+
+"""
+import datetime
+import hashlib
+
+from alembic import op
+import jwt
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f96b07e4c3'
+down_revision = 'c7a1f4e08b52'
+branch_labels = None
+depends_on = None
+
+blacklist_tokens = sa.table('blacklist_tokens',
+                            sa.column('id', sa.Integer),
+                            sa.column('token', sa.String),
+                            sa.column('token_digest', sa.String),
+                            sa.column('expires_on', sa.DateTime))
+
+
+def upgrade():
+    with op.batch_alter_table('blacklist_tokens', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_digest', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('expires_on', sa.DateTime(), nullable=True))
+
+    # replace stored tokens by their digest and expiry, dropping the ones which have expired already
+    connection = op.get_bind()
+    now = datetime.datetime.utcnow()
+    for token_id, token in connection.execute(sa.select([blacklist_tokens.c.id, blacklist_tokens.c.token])).fetchall():
+        try:
+            expires = jwt.decode(token, verify=False).get('exp')
+        except jwt.InvalidTokenError:
+            expires = None
+        expires_on = datetime.datetime.utcfromtimestamp(expires) if expires is not None else None
+
+        if expires_on is not None and expires_on <= now:
+            connection.execute(blacklist_tokens.delete().where(blacklist_tokens.c.id == token_id))
+        else:
+            connection.execute(blacklist_tokens.update().where(blacklist_tokens.c.id == token_id).values(
+                token_digest=hashlib.sha256(token.encode('utf-8')).hexdigest(), expires_on=expires_on))
+
+    with op.batch_alter_table('blacklist_tokens', schema=None) as batch_op:
+        batch_op.alter_column('token_digest', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_unique_constraint('token_digest', ['token_digest'])
+        batch_op.create_index(batch_op.f('ix_blacklist_tokens_expires_on'), ['expires_on'], unique=False)
+        batch_op.drop_column('token')
+
+
+def downgrade():
+    # revoked tokens cannot be recovered from their digests; the ones still valid become usable again
+    op.execute(blacklist_tokens.delete())
+
+    with op.batch_alter_table('blacklist_tokens', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token', sa.String(length=500), nullable=False))
+        batch_op.create_unique_constraint('token', ['token'])
+        batch_op.drop_index(batch_op.f('ix_blacklist_tokens_expires_on'))
+        batch_op.drop_constraint('token_digest', type_='unique')
+        batch_op.drop_column('expires_on')
+        batch_op.drop_column('token_digest')